@@ -2,8 +2,15 @@ from __future__ import annotations
 
 import json
 from dataclasses import fields
+from functools import lru_cache
+from operator import attrgetter
 from pathlib import Path
-from typing import Any, get_args, get_origin, get_type_hints
+from typing import Any, Callable, Iterable, Sequence, get_args, get_origin, get_type_hints
+
+try:
+    import xlsxwriter
+except ImportError:
+    xlsxwriter = None
 
 from openpyxl import Workbook, load_workbook
 from openpyxl.worksheet.worksheet import Worksheet
@@ -31,9 +38,7 @@ SHEET_SPEC: list[tuple[str, str, type[Any]]] = [
 
 
 def export_state_to_excel(path: Path, state: AppState) -> None:
-    wb = Workbook()
-    default_sheet = wb.active
-    wb.remove(default_sheet)
+    wb = Workbook(write_only=True)
 
     for sheet_name, attr_name, model in SHEET_SPEC:
         ws = wb.create_sheet(title=sheet_name)
@@ -44,89 +49,146 @@ def export_state_to_excel(path: Path, state: AppState) -> None:
     wb.save(path)
 
 
+def export_table_to_excel(path: Path, sheet_name: str, header: Sequence[Any], rows: Iterable[Sequence[Any]]) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    if xlsxwriter is not None:
+        wb = xlsxwriter.Workbook(
+            str(path), {"constant_memory": True, "strings_to_numbers": False, "strings_to_urls": False}
+        )
+        ws = wb.add_worksheet(sheet_name)
+        write_row = ws.write_row
+        write_row(0, 0, header)
+        for row_index, row in enumerate(rows, start=1):
+            write_row(row_index, 0, row)
+        wb.close()
+        return
+
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet(title=sheet_name)
+    append = ws.append
+    append(header)
+    for row in rows:
+        append(row)
+    wb.save(path)
+
+
 def import_state_from_excel(path: Path) -> AppState:
-    wb = load_workbook(path, data_only=True)
+    wb = load_workbook(path, data_only=True, read_only=True)
     data: dict[str, Any] = {}
 
-    for sheet_name, attr_name, model in SHEET_SPEC:
-        if sheet_name in wb.sheetnames:
-            ws = wb[sheet_name]
-            data[attr_name] = _read_dataclass_rows(ws, model)
-        else:
-            data[attr_name] = []
+    try:
+        for sheet_name, attr_name, model in SHEET_SPEC:
+            if sheet_name in wb.sheetnames:
+                ws = wb[sheet_name]
+                ws.reset_dimensions()
+                data[attr_name] = _read_dataclass_rows(ws, model)
+            else:
+                data[attr_name] = []
+    finally:
+        wb.close()
 
     return AppState(**data)
 
 
 def _write_dataclass_rows(ws: Worksheet, model: type[Any], rows: list[Any]) -> None:
-    cols = [f.name for f in fields(model)]
+    cols, getter, serializers = _column_encoders(model)
     ws.append(cols)
     for row in rows:
-        ws.append([_serialize_cell(getattr(row, col)) for col in cols])
+        ws.append(tuple(serialize(value) for serialize, value in zip(serializers, getter(row))))
 
 
 def _read_dataclass_rows(ws: Worksheet, model: type[Any]) -> list[Any]:
-    rows = list(ws.iter_rows(values_only=True))
-    if not rows:
+    rows = ws.iter_rows(values_only=True)
+    header_row = next(rows, None)
+    if header_row is None:
         return []
-    headers = [str(h).strip() if h is not None else "" for h in rows[0]]
+    headers = tuple(str(h).strip() if h is not None else "" for h in header_row)
     if not any(headers):
         return []
 
-    allowed = {f.name for f in fields(model)}
-    hints = get_type_hints(model)
+    decoders = _column_decoders(model, headers)
     result: list[Any] = []
 
-    for row in rows[1:]:
+    for row in rows:
         if not any(cell not in (None, "") for cell in row):
             continue
+        width = len(row)
         record: dict[str, Any] = {}
-        for idx, header in enumerate(headers):
-            if not header or header not in allowed:
-                continue
-            raw = row[idx] if idx < len(row) else None
+        for idx, name, decode in decoders:
+            raw = row[idx] if idx < width else None
             if raw in (None, ""):
                 continue
-            record[header] = _deserialize_cell(raw, hints.get(header, str))
+            record[name] = decode(raw)
         result.append(model(**record))
 
     return result
 
 
-def _serialize_cell(value: Any) -> Any:
-    if isinstance(value, list):
-        return json.dumps(value, ensure_ascii=False)
-    return value
+@lru_cache(maxsize=None)
+def _column_encoders(
+    model: type[Any],
+) -> tuple[tuple[str, ...], Callable[[Any], tuple[Any, ...]], tuple[Callable[[Any], Any], ...]]:
+    hints = _hints_for(model)
+    cols = tuple(f.name for f in fields(model))
+    serializers = tuple(_serialize_list if get_origin(hints[col]) is list else _identity for col in cols)
+    return cols, attrgetter(*cols), serializers
+
+
+@lru_cache(maxsize=None)
+def _hints_for(model: type[Any]) -> dict[str, Any]:
+    return get_type_hints(model)
+
+
+@lru_cache(maxsize=None)
+def _column_decoders(
+    model: type[Any],
+    headers: tuple[str, ...],
+) -> tuple[tuple[int, str, Callable[[Any], Any]], ...]:
+    allowed = {f.name for f in fields(model)}
+    hints = _hints_for(model)
+    return tuple(
+        (idx, header, _decoder_for(hints.get(header, str)))
+        for idx, header in enumerate(headers)
+        if header and header in allowed
+    )
 
 
-def _deserialize_cell(value: Any, target_type: Any) -> Any:
+def _serialize_list(value: list[Any]) -> str:
+    return json.dumps(value, ensure_ascii=False)
+
+
+def _decoder_for(target_type: Any) -> Callable[[Any], Any]:
     origin = get_origin(target_type)
     args = get_args(target_type)
 
     if origin is list:
-        return _parse_list(value)
+        return _parse_list
 
     if origin is None and target_type is list:
-        return _parse_list(value)
+        return _parse_list
 
     if origin is None and target_type is bool:
-        return _parse_bool(value)
+        return _parse_bool
 
     if origin is None and target_type is int:
-        return int(value)
+        return int
 
     if origin is not None and type(None) in args:
         non_none = [a for a in args if a is not type(None)]
         if len(non_none) == 1:
             inner = non_none[0]
             if inner is int:
-                return int(value)
+                return int
             if inner is bool:
-                return _parse_bool(value)
+                return _parse_bool
             if get_origin(inner) is list:
-                return _parse_list(value)
-        return value
+                return _parse_list
+        return _identity
+
+    return _identity
+
 
+def _identity(value: Any) -> Any:
     return value
 
 
@@ -1,7 +1,7 @@
 from __future__ import annotations
 
-from dataclasses import asdict, dataclass, field
-from typing import Any
+from dataclasses import MISSING, dataclass, field, fields
+from typing import Any, Callable, get_origin, get_type_hints
 
 DAYS = ["Mon", "Tue", "Wed", "Thu", "Fri", "Sat"]
 SLOTS = [1, 2, 3, 4, 5, 6, 7, 8]
@@ -11,7 +11,16 @@ def slot_key(day: int, slot: int) -> str:
     return f"{day}:{slot}"
 
 
-@dataclass
+def slot_index(day: int, slot: int) -> int:
+    return day * len(SLOTS) + (slot - 1)
+
+
+class NameMap(dict):
+    def __missing__(self, key: str) -> str:
+        return key
+
+
+@dataclass(slots=True)
 class Teacher:
     id: str
     name: str
@@ -27,7 +36,7 @@ class Teacher:
     contract_end_week: int = 15
 
 
-@dataclass
+@dataclass(slots=True)
 class Room:
     id: str
     name: str
@@ -36,7 +45,7 @@ class Room:
     features: list[str] = field(default_factory=list)
 
 
-@dataclass
+@dataclass(slots=True)
 class StudentGroup:
     id: str
     name: str
@@ -49,7 +58,7 @@ class StudentGroup:
     program_end_week: int = 15
 
 
-@dataclass
+@dataclass(slots=True)
 class Stream:
     id: str
     name: str
@@ -58,7 +67,7 @@ class Stream:
     notes: str = ""
 
 
-@dataclass
+@dataclass(slots=True)
 class Discipline:
     id: str
     name: str
@@ -70,7 +79,7 @@ class Discipline:
     practice_as_lab_exception: bool = True
 
 
-@dataclass
+@dataclass(slots=True)
 class Assignment:
     id: str
     discipline_id: str
@@ -90,7 +99,7 @@ class Assignment:
     notes: str = ""
 
 
-@dataclass
+@dataclass(slots=True)
 class ScheduleEntry:
     assignment_id: str
     discipline_id: str
@@ -103,7 +112,63 @@ class ScheduleEntry:
     end_week: int
 
 
-@dataclass
+def schedule_sort_key(entry: ScheduleEntry) -> tuple[int, int, str]:
+    return entry.day, entry.slot, entry.assignment_id
+
+
+def _compile_codecs(cls: type[Any]) -> tuple[Callable[[Any], dict[str, Any]], Callable[[dict[str, Any]], Any]]:
+    hints = get_type_hints(cls)
+    field_names = frozenset(f.name for f in fields(cls))
+    required = tuple(f.name for f in fields(cls) if f.default is MISSING and f.default_factory is MISSING)
+    namespace: dict[str, Any] = {
+        "cls": cls,
+        "field_names": field_names,
+        "required": required,
+        "required_names": frozenset(required),
+    }
+    to_items: list[str] = []
+    from_args: list[str] = []
+    for f in fields(cls):
+        name = f.name
+        if get_origin(hints[name]) is list:
+            to_items.append(f"{name!r}: None if obj.{name} is None else list(obj.{name})")
+        else:
+            to_items.append(f"{name!r}: obj.{name}")
+
+        if f.default is not MISSING:
+            namespace[f"default_{name}"] = f.default
+            from_args.append(f"{name}=d[{name!r}] if {name!r} in d else default_{name}")
+        elif f.default_factory is not MISSING:
+            namespace[f"factory_{name}"] = f.default_factory
+            from_args.append(f"{name}=d[{name!r}] if {name!r} in d else factory_{name}()")
+        else:
+            from_args.append(f"{name}=d[{name!r}]")
+
+    source = (
+        "def to_dict(obj):\n"
+        f"    return {{{', '.join(to_items)}}}\n"
+        "\n"
+        "def from_dict(d):\n"
+        "    if not field_names.issuperset(d):\n"
+        "        raise TypeError(f'{cls.__name__}: неизвестные поля {sorted(set(d) - field_names)}')\n"
+        "    if not required_names.issubset(d):\n"
+        "        raise TypeError(f'{cls.__name__}: отсутствуют обязательные поля {[n for n in required if n not in d]}')\n"
+        f"    return cls({', '.join(from_args)})\n"
+    )
+    exec(source, namespace)
+    return namespace["to_dict"], namespace["from_dict"]
+
+
+_teacher_to_dict, _teacher_from_dict = _compile_codecs(Teacher)
+_room_to_dict, _room_from_dict = _compile_codecs(Room)
+_group_to_dict, _group_from_dict = _compile_codecs(StudentGroup)
+_stream_to_dict, _stream_from_dict = _compile_codecs(Stream)
+_discipline_to_dict, _discipline_from_dict = _compile_codecs(Discipline)
+_assignment_to_dict, _assignment_from_dict = _compile_codecs(Assignment)
+_schedule_entry_to_dict, _schedule_entry_from_dict = _compile_codecs(ScheduleEntry)
+
+
+@dataclass(slots=True)
 class AppState:
     teachers: list[Teacher] = field(default_factory=list)
     rooms: list[Room] = field(default_factory=list)
@@ -112,26 +177,83 @@ class AppState:
     disciplines: list[Discipline] = field(default_factory=list)
     assignments: list[Assignment] = field(default_factory=list)
     schedule: list[ScheduleEntry] = field(default_factory=list)
+    _indexes: dict[str, tuple[list[Any], int, int, dict[str, Any]]] = field(
+        default_factory=dict, init=False, repr=False, compare=False
+    )
+    _version: int = field(default=0, init=False, repr=False, compare=False)
+    _validated_version: int = field(default=-1, init=False, repr=False, compare=False)
+
+    def mark_changed(self) -> None:
+        self._version += 1
+
+    def _index(self, attr: str, names: bool = False) -> dict[str, Any]:
+        items = getattr(self, attr)
+        key = f"{attr}:names" if names else attr
+        cached = self._indexes.get(key)
+        if cached is not None and cached[0] is items and cached[1] == len(items) and cached[2] == self._version:
+            return cached[3]
+        if names:
+            index: dict[str, Any] = NameMap((item.id, item.name) for item in items)
+        else:
+            index = {item.id: item for item in items}
+        self._indexes[key] = (items, len(items), self._version, index)
+        return index
+
+    @property
+    def teachers_by_id(self) -> dict[str, Teacher]:
+        return self._index("teachers")
+
+    @property
+    def rooms_by_id(self) -> dict[str, Room]:
+        return self._index("rooms")
+
+    @property
+    def streams_by_id(self) -> dict[str, Stream]:
+        return self._index("streams")
+
+    @property
+    def disciplines_by_id(self) -> dict[str, Discipline]:
+        return self._index("disciplines")
+
+    @property
+    def assignments_by_id(self) -> dict[str, Assignment]:
+        return self._index("assignments")
+
+    @property
+    def teacher_names(self) -> NameMap:
+        return self._index("teachers", names=True)
+
+    @property
+    def room_names(self) -> NameMap:
+        return self._index("rooms", names=True)
+
+    @property
+    def stream_names(self) -> NameMap:
+        return self._index("streams", names=True)
+
+    @property
+    def discipline_names(self) -> NameMap:
+        return self._index("disciplines", names=True)
 
     def to_dict(self) -> dict[str, Any]:
         return {
-            "teachers": [asdict(t) for t in self.teachers],
-            "rooms": [asdict(r) for r in self.rooms],
-            "groups": [asdict(g) for g in self.groups],
-            "streams": [asdict(s) for s in self.streams],
-            "disciplines": [asdict(d) for d in self.disciplines],
-            "assignments": [asdict(a) for a in self.assignments],
-            "schedule": [asdict(s) for s in self.schedule],
+            "teachers": [_teacher_to_dict(t) for t in self.teachers],
+            "rooms": [_room_to_dict(r) for r in self.rooms],
+            "groups": [_group_to_dict(g) for g in self.groups],
+            "streams": [_stream_to_dict(s) for s in self.streams],
+            "disciplines": [_discipline_to_dict(d) for d in self.disciplines],
+            "assignments": [_assignment_to_dict(a) for a in self.assignments],
+            "schedule": [_schedule_entry_to_dict(s) for s in self.schedule],
         }
 
     @classmethod
     def from_dict(cls, data: dict[str, Any]) -> "AppState":
         return cls(
-            teachers=[Teacher(**item) for item in data.get("teachers", [])],
-            rooms=[Room(**item) for item in data.get("rooms", [])],
-            groups=[StudentGroup(**item) for item in data.get("groups", [])],
-            streams=[Stream(**item) for item in data.get("streams", [])],
-            disciplines=[Discipline(**item) for item in data.get("disciplines", [])],
-            assignments=[Assignment(**item) for item in data.get("assignments", [])],
-            schedule=[ScheduleEntry(**item) for item in data.get("schedule", [])],
+            teachers=[_teacher_from_dict(item) for item in data.get("teachers", [])],
+            rooms=[_room_from_dict(item) for item in data.get("rooms", [])],
+            groups=[_group_from_dict(item) for item in data.get("groups", [])],
+            streams=[_stream_from_dict(item) for item in data.get("streams", [])],
+            disciplines=[_discipline_from_dict(item) for item in data.get("disciplines", [])],
+            assignments=[_assignment_from_dict(item) for item in data.get("assignments", [])],
+            schedule=[_schedule_entry_from_dict(item) for item in data.get("schedule", [])],
         )
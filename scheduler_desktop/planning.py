@@ -1,6 +1,8 @@
 from __future__ import annotations
 
+import os
 from collections import defaultdict
+from collections.abc import Iterable
 from dataclasses import dataclass
 
 from ortools.sat.python import cp_model
@@ -16,7 +18,8 @@ from scheduler_desktop.models import (
     Stream,
     StudentGroup,
     Teacher,
-    slot_key,
+    schedule_sort_key,
+    slot_index,
 )
 
 
@@ -38,7 +41,48 @@ def weeks_overlap(a: Assignment, b: Assignment) -> bool:
     return not (a.end_week < b.start_week or b.end_week < a.start_week)
 
 
+_GRID_SIZE = len(DAYS) * len(SLOTS)
+_HINT_ZERO_SAMPLE = 2
+
+
+def _parse_blocked_slots(keys: Iterable[str]) -> frozenset[int]:
+    indices: set[int] = set()
+    for key in keys:
+        day, _, slot = str(key).partition(":")
+        try:
+            day_value, slot_value = int(day), int(slot)
+        except ValueError:
+            continue
+        if 0 <= day_value < len(DAYS) and slot_value in SLOTS:
+            indices.add(slot_index(day_value, slot_value))
+    return frozenset(indices)
+
+
+def _availability_mask(days: Iterable[int], slots: Iterable[int], blocked: frozenset[int]) -> int:
+    slot_list = list(slots)
+    mask = 0
+    for day in days:
+        for slot in slot_list:
+            index = slot_index(day, slot)
+            if index not in blocked:
+                mask |= 1 << index
+    return mask
+
+
+def _mask_to_slots(mask: int) -> list[tuple[int, int]]:
+    result: list[tuple[int, int]] = []
+    while mask:
+        low = mask & -mask
+        day, offset = divmod(low.bit_length() - 1, len(SLOTS))
+        result.append((day, SLOTS[offset]))
+        mask ^= low
+    return result
+
+
 def validate_state(state: AppState) -> None:
+    if state._validated_version == state._version:
+        return
+
     teacher_ids = {t.id for t in state.teachers}
     room_ids = {r.id for r in state.rooms}
     group_ids = {g.id for g in state.groups}
@@ -71,6 +115,8 @@ def validate_state(state: AppState) -> None:
         if assignment.start_week > assignment.end_week:
             raise PlanningError(f"Назначение {assignment.id}: start_week больше end_week")
 
+    state._validated_version = state._version
+
 
 class ScheduleGenerator:
     def __init__(self, state: AppState) -> None:
@@ -83,8 +129,43 @@ class ScheduleGenerator:
         self.assignments = {a.id: a for a in state.assignments}
         self.max_week = max((a.end_week for a in state.assignments), default=1)
 
-    def generate(self, time_limit_sec: int = 12) -> list[ScheduleEntry]:
+        self._teacher_blocked: dict[str, frozenset[int]] = {
+            t.id: _parse_blocked_slots(t.blocked_slots) for t in state.teachers
+        }
+        self._group_blocked: dict[str, frozenset[int]] = {
+            g.id: _parse_blocked_slots(g.blocked_slots) for g in state.groups
+        }
+
+        self._teacher_masks: dict[str, int] = {}
+        for teacher in state.teachers:
+            work_days = frozenset(teacher.work_days)
+            self._teacher_masks[teacher.id] = _availability_mask(
+                (day for day in range(len(DAYS)) if day in work_days),
+                SLOTS,
+                self._teacher_blocked[teacher.id],
+            )
+        self._group_masks: dict[str, int] = {}
+        for group in state.groups:
+            blocked_days = frozenset(group.blocked_days)
+            self._group_masks[group.id] = _availability_mask(
+                (day for day in range(len(DAYS)) if day not in blocked_days),
+                (slot for slot in SLOTS if group.shift_start_slot <= slot <= group.shift_end_slot),
+                self._group_blocked[group.id],
+            )
+        self._group_combo_masks: dict[tuple[str, ...], int] = {}
+        self._room_feature_sets: dict[str, frozenset[str]] = {r.id: frozenset(r.features or ()) for r in state.rooms}
+        self._group_ids_by_assignment: dict[str, tuple[str, ...]] = {}
+        self._assignment_total_size: dict[str, int] = {}
+
+    def generate(self, time_limit_sec: int = 12, workers: int | None = None) -> list[ScheduleEntry]:
         validate_state(self.state)
+        self._group_ids_by_assignment = {
+            assignment.id: self._assignment_group_ids(assignment) for assignment in self.state.assignments
+        }
+        self._assignment_total_size = {
+            assignment_id: sum(self.groups[group_id].size for group_id in group_ids)
+            for assignment_id, group_ids in self._group_ids_by_assignment.items()
+        }
         model = cp_model.CpModel()
 
         sessions: list[SessionRef] = []
@@ -95,14 +176,16 @@ class ScheduleGenerator:
         if not sessions:
             return []
 
-        candidate_timeslots: dict[str, list[tuple[int, int]]] = {}
-        candidate_rooms: dict[str, list[str]] = {}
+        timeslot_cands_by_assignment: dict[str, list[tuple[int, int]]] = {}
+        room_cands_by_assignment: dict[str, list[str]] = {}
 
         for session in sessions:
+            if session.assignment_id in timeslot_cands_by_assignment:
+                continue
             assignment = self.assignments[session.assignment_id]
             discipline = self.disciplines[assignment.discipline_id]
             teacher = self.teachers[assignment.teacher_id]
-            assignment_group_ids = self._assignment_group_ids(assignment)
+            assignment_group_ids = self._group_ids_by_assignment[assignment.id]
 
             self._validate_contract_window(assignment, teacher)
             for group_id in assignment_group_ids:
@@ -121,29 +204,60 @@ class ScheduleGenerator:
                     f"(вместимость/тип/фиксированная аудитория)"
                 )
 
-            candidate_timeslots[session.key] = slots
-            candidate_rooms[session.key] = rooms
+            timeslot_cands_by_assignment[assignment.id] = slots
+            room_cands_by_assignment[assignment.id] = rooms
+
+        candidate_timeslots: dict[str, list[tuple[int, int]]] = {
+            session.key: timeslot_cands_by_assignment[session.assignment_id] for session in sessions
+        }
+        candidate_rooms: dict[str, list[str]] = {
+            session.key: room_cands_by_assignment[session.assignment_id] for session in sessions
+        }
 
-        y_vars: dict[tuple[str, int, int], cp_model.IntVar] = {}
-        x_vars: dict[tuple[str, int, int, str], cp_model.IntVar] = {}
+        y_by_session: dict[str, list[cp_model.IntVar | None]] = {}
+        x_by_session_room: dict[str, dict[str, list[cp_model.IntVar | None]]] = {}
 
         for session in sessions:
             skey = session.key
+            session_rooms = candidate_rooms[skey]
+            single_room = len(session_rooms) == 1
+            y_grid: list[cp_model.IntVar | None] = [None] * _GRID_SIZE
+            if single_room:
+                x_grids: dict[str, list[cp_model.IntVar | None]] = {session_rooms[0]: y_grid}
+            else:
+                x_grids = {room_id: [None] * _GRID_SIZE for room_id in session_rooms}
+            y_by_session[skey] = y_grid
+            x_by_session_room[skey] = x_grids
+
             slot_choice_vars: list[cp_model.IntVar] = []
             for day, slot in candidate_timeslots[skey]:
+                bit = slot_index(day, slot)
                 y = model.NewBoolVar(f"y_{skey}_{day}_{slot}")
-                y_vars[(skey, day, slot)] = y
+                y_grid[bit] = y
                 slot_choice_vars.append(y)
+                if single_room:
+                    continue
 
                 room_vars: list[cp_model.IntVar] = []
-                for room_id in candidate_rooms[skey]:
+                for room_id, x_grid in x_grids.items():
                     x = model.NewBoolVar(f"x_{skey}_{day}_{slot}_{room_id}")
-                    x_vars[(skey, day, slot, room_id)] = x
+                    x_grid[bit] = x
                     room_vars.append(x)
 
-                model.Add(sum(room_vars) == y)
+                model.Add(cp_model.LinearExpr.Sum(room_vars) == y)
+
+            model.AddExactlyOne(slot_choice_vars)
 
-            model.Add(sum(slot_choice_vars) == 1)
+        for assignment in self.state.assignments:
+            if assignment.sessions_per_week < 2:
+                continue
+            indices = [slot_index(day, slot) for day, slot in timeslot_cands_by_assignment[assignment.id]]
+            session_order = []
+            for idx in range(assignment.sessions_per_week):
+                y_grid = y_by_session[SessionRef(assignment_id=assignment.id, session_index=idx).key]
+                session_order.append(cp_model.LinearExpr.WeightedSum([y_grid[i] for i in indices], indices))
+            for earlier, later in zip(session_order, session_order[1:]):
+                model.Add(earlier < later)
 
         by_week_and_day_teacher: dict[tuple[int, int, str], list[cp_model.IntVar]] = defaultdict(list)
         by_week_teacher: dict[tuple[int, str], list[cp_model.IntVar]] = defaultdict(list)
@@ -151,85 +265,109 @@ class ScheduleGenerator:
         by_week_slot_group: dict[tuple[int, int, int, str], list[cp_model.IntVar]] = defaultdict(list)
         by_week_slot_room: dict[tuple[int, int, int, str], list[cp_model.IntVar]] = defaultdict(list)
 
+        by_wdt = by_week_and_day_teacher
+        by_wt = by_week_teacher
+        by_wst = by_week_slot_teacher
+        by_wsg = by_week_slot_group
+        by_wsr = by_week_slot_room
         for session in sessions:
             assignment = self.assignments[session.assignment_id]
             teacher_id = assignment.teacher_id
             skey = session.key
-            assignment_group_ids = self._assignment_group_ids(assignment)
+            assignment_group_ids = self._group_ids_by_assignment[assignment.id]
+            y_grid = y_by_session[skey]
+            x_grids = x_by_session_room[skey]
+            weeks = range(assignment.start_week, assignment.end_week + 1)
 
-            for week in range(assignment.start_week, assignment.end_week + 1):
-                for day, slot in candidate_timeslots[skey]:
-                    y = y_vars[(skey, day, slot)]
-                    by_week_and_day_teacher[(week, day, teacher_id)].append(y)
-                    by_week_teacher[(week, teacher_id)].append(y)
-                    by_week_slot_teacher[(week, day, slot, teacher_id)].append(y)
+            for day, slot in candidate_timeslots[skey]:
+                bit = slot_index(day, slot)
+                y = y_grid[bit]
+                room_vars = [(room_id, x_grid[bit]) for room_id, x_grid in x_grids.items()]
+
+                for week in weeks:
+                    by_wdt[(week, day, teacher_id)].append(y)
+                    by_wt[(week, teacher_id)].append(y)
+                    by_wst[(week, day, slot, teacher_id)].append(y)
 
                     for group_id in assignment_group_ids:
-                        by_week_slot_group[(week, day, slot, group_id)].append(y)
+                        by_wsg[(week, day, slot, group_id)].append(y)
 
-                    for room_id in candidate_rooms[skey]:
-                        x = x_vars[(skey, day, slot, room_id)]
-                        by_week_slot_room[(week, day, slot, room_id)].append(x)
+                    for room_id, x in room_vars:
+                        by_wsr[(week, day, slot, room_id)].append(x)
 
         for vars_ in by_week_slot_teacher.values():
-            model.Add(sum(vars_) <= 1)
+            model.AddAtMostOne(vars_)
         for vars_ in by_week_slot_group.values():
-            model.Add(sum(vars_) <= 1)
+            model.AddAtMostOne(vars_)
         for vars_ in by_week_slot_room.values():
-            model.Add(sum(vars_) <= 1)
+            model.AddAtMostOne(vars_)
 
         for (week, day, teacher_id), vars_ in by_week_and_day_teacher.items():
             teacher = self.teachers[teacher_id]
-            model.Add(sum(vars_) <= teacher.max_classes_per_day)
+            model.Add(cp_model.LinearExpr.Sum(vars_) <= teacher.max_classes_per_day)
         for (week, teacher_id), vars_ in by_week_teacher.items():
             teacher = self.teachers[teacher_id]
-            model.Add(sum(vars_) <= teacher.max_classes_per_week)
+            model.Add(cp_model.LinearExpr.Sum(vars_) <= teacher.max_classes_per_week)
 
-        penalties: list[cp_model.LinearExpr] = []
+        penalty_vars: list[cp_model.IntVar] = []
+        penalty_coeffs: list[int] = []
         for session in sessions:
             assignment = self.assignments[session.assignment_id]
-            discipline = self.disciplines[assignment.discipline_id]
-            teacher = self.teachers[assignment.teacher_id]
-            assignment_group_ids = self._assignment_group_ids(assignment)
             skey = session.key
+            y_grid = y_by_session[skey]
+
+            for room_id, x_grid in x_by_session_room[skey].items():
+                room_penalty = self._room_penalty(assignment, room_id)
+                if room_penalty:
+                    for day, slot in candidate_timeslots[skey]:
+                        penalty_vars.append(x_grid[slot_index(day, slot)])
+                        penalty_coeffs.append(room_penalty)
 
             for day, slot in candidate_timeslots[skey]:
-                for room_id in candidate_rooms[skey]:
-                    x = x_vars[(skey, day, slot, room_id)]
-                    room = self.rooms[room_id]
-
-                    penalty = 0
-                    if teacher.default_room_id and room_id != teacher.default_room_id:
-                        penalty += 2
-                    if assignment.room_id and room_id != assignment.room_id:
-                        penalty += 5
-                    if discipline.fixed_room_id and room_id != discipline.fixed_room_id:
-                        penalty += 7
-                    if slot >= 6:
-                        penalty += 1
-
-                    group_shift_penalty = 0
-                    for group_id in assignment_group_ids:
-                        group = self.groups[group_id]
-                        if slot > group.shift_end_slot:
-                            group_shift_penalty += 4
-                        if slot < group.shift_start_slot:
-                            group_shift_penalty += 4
-                    penalty += group_shift_penalty
+                slot_penalty = self._slot_penalty(assignment, slot)
+                if slot_penalty:
+                    penalty_vars.append(y_grid[slot_index(day, slot)])
+                    penalty_coeffs.append(slot_penalty)
 
-                    if penalty:
-                        penalties.append(penalty * x)
+        if penalty_vars:
+            model.Minimize(cp_model.LinearExpr.WeightedSum(penalty_vars, penalty_coeffs))
 
-        if penalties:
-            model.Minimize(sum(penalties))
+        placement = self._greedy_placement(sessions, candidate_timeslots, candidate_rooms)
+        for session in sessions:
+            chosen = placement.get(session.key)
+            if chosen is None:
+                continue
+            chosen_bit, chosen_room = chosen
+            y_grid = y_by_session[session.key]
+            x_grid = x_by_session_room[session.key][chosen_room]
+            model.AddHint(y_grid[chosen_bit], 1)
+            if x_grid is not y_grid:
+                model.AddHint(x_grid[chosen_bit], 1)
+            zero_hints = 0
+            for day, slot in candidate_timeslots[session.key]:
+                if zero_hints == _HINT_ZERO_SAMPLE:
+                    break
+                bit = slot_index(day, slot)
+                if bit != chosen_bit:
+                    model.AddHint(y_grid[bit], 0)
+                    zero_hints += 1
 
         solver = cp_model.CpSolver()
         solver.parameters.max_time_in_seconds = time_limit_sec
-        solver.parameters.num_search_workers = 8
+        solver.parameters.num_search_workers = workers if workers else max(1, os.cpu_count() or 2)
+        solver.parameters.linearization_level = 2
+        solver.parameters.cp_model_probing_level = 2
+        solver.parameters.symmetry_level = 2
         solver.parameters.log_search_progress = False
         status = solver.Solve(model)
 
-        if status not in (cp_model.OPTIMAL, cp_model.FEASIBLE):
+        if status in (cp_model.OPTIMAL, cp_model.FEASIBLE):
+            chosen_by_session = self._solved_placement(
+                solver, sessions, candidate_timeslots, y_by_session, x_by_session_room
+            )
+        elif status == cp_model.UNKNOWN and len(placement) == len(sessions):
+            chosen_by_session = placement
+        else:
             raise PlanningError(
                 "Не удалось построить расписание с текущими ограничениями. "
                 "Ослабьте ограничения или замените ресурсы."
@@ -238,41 +376,137 @@ class ScheduleGenerator:
         result: list[ScheduleEntry] = []
         for session in sessions:
             assignment = self.assignments[session.assignment_id]
-            skey = session.key
-            chosen_day = None
-            chosen_slot = None
-            chosen_room = None
-            for day, slot in candidate_timeslots[skey]:
-                if solver.Value(y_vars[(skey, day, slot)]) == 1:
-                    chosen_day = day
-                    chosen_slot = slot
-                    for room_id in candidate_rooms[skey]:
-                        x = x_vars[(skey, day, slot, room_id)]
-                        if solver.Value(x) == 1:
-                            chosen_room = room_id
-                            break
-                    break
-
-            if chosen_day is None or chosen_slot is None or chosen_room is None:
-                raise PlanningError(f"Внутренняя ошибка: не выбран слот для {skey}")
-
+            bit, room_id = chosen_by_session[session.key]
+            day, offset = divmod(bit, len(SLOTS))
             result.append(
                 ScheduleEntry(
                     assignment_id=assignment.id,
                     discipline_id=assignment.discipline_id,
                     teacher_id=assignment.teacher_id,
-                    group_ids=assignment_group_ids,
-                    day=chosen_day,
-                    slot=chosen_slot,
-                    room_id=chosen_room,
+                    group_ids=list(self._group_ids_by_assignment[assignment.id]),
+                    day=day,
+                    slot=SLOTS[offset],
+                    room_id=room_id,
                     start_week=assignment.start_week,
                     end_week=assignment.end_week,
                 )
             )
 
-        result.sort(key=lambda s: (s.day, s.slot, s.assignment_id))
+        result.sort(key=schedule_sort_key)
         return result
 
+    def _room_penalty(self, assignment: Assignment, room_id: str) -> int:
+        teacher = self.teachers[assignment.teacher_id]
+        discipline = self.disciplines[assignment.discipline_id]
+        penalty = 0
+        if teacher.default_room_id and room_id != teacher.default_room_id:
+            penalty += 2
+        if assignment.room_id and room_id != assignment.room_id:
+            penalty += 5
+        if discipline.fixed_room_id and room_id != discipline.fixed_room_id:
+            penalty += 7
+        return penalty
+
+    def _slot_penalty(self, assignment: Assignment, slot: int) -> int:
+        penalty = 0
+        if slot >= 6:
+            penalty += 1
+        for group_id in self._group_ids_by_assignment[assignment.id]:
+            group = self.groups[group_id]
+            if slot > group.shift_end_slot:
+                penalty += 4
+            if slot < group.shift_start_slot:
+                penalty += 4
+        return penalty
+
+    @staticmethod
+    def _solved_placement(
+        solver: cp_model.CpSolver,
+        sessions: list[SessionRef],
+        candidate_timeslots: dict[str, list[tuple[int, int]]],
+        y_by_session: dict[str, list[cp_model.IntVar | None]],
+        x_by_session_room: dict[str, dict[str, list[cp_model.IntVar | None]]],
+    ) -> dict[str, tuple[int, str]]:
+        placement: dict[str, tuple[int, str]] = {}
+        for session in sessions:
+            skey = session.key
+            y_grid = y_by_session[skey]
+            for day, slot in candidate_timeslots[skey]:
+                bit = slot_index(day, slot)
+                if solver.Value(y_grid[bit]) == 1:
+                    for room_id, x_grid in x_by_session_room[skey].items():
+                        if solver.Value(x_grid[bit]) == 1:
+                            placement[skey] = (bit, room_id)
+                            break
+                    break
+
+            if skey not in placement:
+                raise PlanningError(f"Внутренняя ошибка: не выбран слот для {skey}")
+        return placement
+
+    def _greedy_placement(
+        self,
+        sessions: list[SessionRef],
+        candidate_timeslots: dict[str, list[tuple[int, int]]],
+        candidate_rooms: dict[str, list[str]],
+    ) -> dict[str, tuple[int, str]]:
+        occupied: dict[tuple[int, str, str], int] = {}
+        day_load: dict[tuple[int, int, str], int] = defaultdict(int)
+        week_load: dict[tuple[int, str], int] = defaultdict(int)
+        last_bit: dict[str, int] = {}
+        placement: dict[str, tuple[int, str]] = {}
+
+        for session in sessions:
+            assignment = self.assignments[session.assignment_id]
+            teacher = self.teachers[assignment.teacher_id]
+            weeks = range(assignment.start_week, assignment.end_week + 1)
+            if any(week_load[(week, teacher.id)] >= teacher.max_classes_per_week for week in weeks):
+                continue
+
+            people = [("teacher", teacher.id)] + [
+                ("group", group_id) for group_id in self._group_ids_by_assignment[assignment.id]
+            ]
+            people_taken = 0
+            for week in weeks:
+                for kind, resource_id in people:
+                    people_taken |= occupied.get((week, kind, resource_id), 0)
+            room_taken: dict[str, int] = {}
+            for room_id in candidate_rooms[session.key]:
+                taken = 0
+                for week in weeks:
+                    taken |= occupied.get((week, "room", room_id), 0)
+                room_taken[room_id] = taken
+            full_days = {
+                day
+                for day in range(len(DAYS))
+                if any(day_load[(week, day, teacher.id)] >= teacher.max_classes_per_day for week in weeks)
+            }
+
+            room_penalties = {room_id: self._room_penalty(assignment, room_id) for room_id in room_taken}
+            options = sorted(
+                (self._slot_penalty(assignment, slot) + room_penalty, slot_index(day, slot), day, room_id)
+                for day, slot in candidate_timeslots[session.key]
+                if day not in full_days
+                for room_id, room_penalty in room_penalties.items()
+            )
+
+            min_bit = last_bit.get(assignment.id, -1)
+            for _, bit, day, room_id in options:
+                flag = 1 << bit
+                if bit <= min_bit or (people_taken | room_taken[room_id]) & flag:
+                    continue
+                for week in weeks:
+                    for kind, resource_id in [*people, ("room", room_id)]:
+                        key = (week, kind, resource_id)
+                        occupied[key] = occupied.get(key, 0) | flag
+                    day_load[(week, day, teacher.id)] += 1
+                    week_load[(week, teacher.id)] += 1
+                placement[session.key] = (bit, room_id)
+                last_bit[assignment.id] = bit
+                break
+
+        return placement
+
     def _validate_contract_window(self, assignment: Assignment, teacher: Teacher) -> None:
         if assignment.start_week < teacher.contract_start_week or assignment.end_week > teacher.contract_end_week:
             raise PlanningError(
@@ -292,36 +526,24 @@ class ScheduleGenerator:
         assignment: Assignment,
         teacher: Teacher,
     ) -> list[tuple[int, int]]:
-        slots: list[tuple[int, int]] = []
-        locked = assignment.lock_day is not None and assignment.lock_slot is not None
-        assignment_group_ids = self._assignment_group_ids(assignment)
+        group_ids = self._group_ids_by_assignment[assignment.id]
+        mask = self._teacher_masks[teacher.id] & self._group_combo_mask(group_ids)
 
-        for day in range(len(DAYS)):
-            for slot in SLOTS:
-                if locked and (day != assignment.lock_day or slot != assignment.lock_slot):
-                    continue
-                if day not in teacher.work_days:
-                    continue
-                if slot_key(day, slot) in teacher.blocked_slots:
-                    continue
+        if assignment.lock_day is not None and assignment.lock_slot is not None:
+            if assignment.lock_day not in range(len(DAYS)) or assignment.lock_slot not in SLOTS:
+                return []
+            mask &= 1 << slot_index(assignment.lock_day, assignment.lock_slot)
 
-                allowed_for_all_groups = True
-                for group_id in assignment_group_ids:
-                    group = self.groups[group_id]
-                    if day in group.blocked_days:
-                        allowed_for_all_groups = False
-                        break
-                    if slot < group.shift_start_slot or slot > group.shift_end_slot:
-                        allowed_for_all_groups = False
-                        break
-                    if slot_key(day, slot) in group.blocked_slots:
-                        allowed_for_all_groups = False
-                        break
-                if not allowed_for_all_groups:
-                    continue
+        return _mask_to_slots(mask)
 
-                slots.append((day, slot))
-        return slots
+    def _group_combo_mask(self, group_ids: tuple[str, ...]) -> int:
+        mask = self._group_combo_masks.get(group_ids)
+        if mask is None:
+            mask = -1
+            for group_id in group_ids:
+                mask &= self._group_masks[group_id]
+            self._group_combo_masks[group_ids] = mask
+        return mask
 
     def _build_room_candidates(
         self,
@@ -353,19 +575,11 @@ class ScheduleGenerator:
         return rooms
 
     def _room_fits_assignment(self, room: Room, assignment: Assignment, discipline: Discipline) -> bool:
-        total_students = sum(self.groups[group_id].size for group_id in self._assignment_group_ids(assignment))
-        if room.capacity < total_students:
+        if room.capacity < self._assignment_total_size[assignment.id]:
             return False
+        return self._room_feature_sets[room.id].issuperset(discipline.required_room_features or ())
 
-        if discipline.required_room_features:
-            room_features = set(room.features)
-            for feature in discipline.required_room_features:
-                if feature not in room_features:
-                    return False
-
-        return True
-
-    def _assignment_group_ids(self, assignment: Assignment) -> list[str]:
+    def _assignment_group_ids(self, assignment: Assignment) -> tuple[str, ...]:
         resolved: list[str] = []
         if assignment.stream_id:
             stream = self.streams.get(assignment.stream_id)
@@ -373,7 +587,7 @@ class ScheduleGenerator:
                 resolved.extend(stream.group_ids)
         resolved.extend(assignment.group_ids)
 
-        unique_ids = sorted(set(resolved))
+        unique_ids = tuple(sorted(set(resolved)))
         if not unique_ids:
             raise PlanningError(
                 f"Назначение {assignment.id}: не заданы группы (ни в group_ids, ни в stream_id)"
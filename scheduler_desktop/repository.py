@@ -3,6 +3,11 @@ from __future__ import annotations
 import json
 from pathlib import Path
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 from scheduler_desktop.excel_io import export_state_to_excel, import_state_from_excel
 from scheduler_desktop.models import (
     AppState,
@@ -24,7 +29,10 @@ class StateRepository:
             return sample_state()
         if self.path.suffix.lower() == ".xlsx":
             return import_state_from_excel(self.path)
-        data = json.loads(self.path.read_text(encoding="utf-8"))
+        if orjson is not None:
+            data = orjson.loads(self.path.read_bytes())
+        else:
+            data = json.loads(self.path.read_text(encoding="utf-8"))
         return AppState.from_dict(data)
 
     def save(self, state: AppState) -> None:
@@ -32,6 +40,9 @@ class StateRepository:
         if self.path.suffix.lower() == ".xlsx":
             export_state_to_excel(self.path, state)
             return
+        if orjson is not None:
+            self.path.write_bytes(orjson.dumps(state.to_dict(), option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS))
+            return
         self.path.write_text(json.dumps(state.to_dict(), ensure_ascii=False, indent=2), encoding="utf-8")
 
 
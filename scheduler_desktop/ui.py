@@ -1,18 +1,36 @@
 from __future__ import annotations
 
 import json
+from concurrent.futures import Future, ThreadPoolExecutor
+from operator import attrgetter
 from pathlib import Path
-from tkinter import filedialog, messagebox, ttk
+from tkinter import filedialog, messagebox, ttk
+from typing import Any, Callable, Iterator
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
 import customtkinter as ctk
-from openpyxl import Workbook
+import numpy as np
 
-from scheduler_desktop.excel_io import export_state_to_excel, import_state_from_excel
-from scheduler_desktop.models import DAYS, SLOTS, AppState, Assignment, ScheduleEntry, slot_key
-from scheduler_desktop.planning import PlanningError, ScheduleGenerator
+from scheduler_desktop.excel_io import export_state_to_excel, export_table_to_excel, import_state_from_excel
+from scheduler_desktop.models import DAYS, SLOTS, AppState, Assignment, NameMap, ScheduleEntry, schedule_sort_key, slot_index, slot_key
+from scheduler_desktop.planning import ScheduleGenerator
 from scheduler_desktop.repository import StateRepository, sample_state
 
-DAY_LABELS_RU = ["Пн", "Вт", "Ср", "Чт", "Пт", "Сб"]
+DAY_LABELS_RU = ("Пн", "Вт", "Ср", "Чт", "Пт", "Сб")
+TASK_POLL_MS = 100
+JSON_FLUSH_MS = 200
+SCHEDULE_PAGE_SIZE = 2000
+ENTRY_TIME_KEY = attrgetter("day", "slot")
+EXPORT_SEGMENT_THRESHOLD = 250_000
+EXPORT_SEGMENT_SIZE = 250_000
+SCHEDULE_EXPORT_HEADER = ("assignment_id", "discipline", "teacher", "groups", "day", "slot", "room", "weeks")
+CARD_STYLE = {"fg_color": "#ffffff", "corner_radius": 16, "border_width": 1, "border_color": "#d3dfda"}
+HEADER_FONT = ("Segoe UI Semibold", 22)
+TITLE_FONT = ("Segoe UI Semibold", 24)
 
 
 class SchedulerDesktopApp(ctk.CTk):
@@ -20,6 +38,7 @@ class SchedulerDesktopApp(ctk.CTk):
         super().__init__()
         self.repo = repository
         self.app_state = self.repo.load()
+        self.app_state.schedule.sort(key=schedule_sort_key)
         self.title("UniSchedule Generator")
         self.geometry("1420x860")
         self.minsize(1220, 760)
@@ -28,16 +47,57 @@ class SchedulerDesktopApp(ctk.CTk):
         self.configure(fg_color="#f4f7f8")
         self._setup_treeview_style()
 
+        self._data_version = 0
+        self._schedule_version = 0
+        self._panel_versions: dict[str, tuple[int, ...]] = {}
+        self._assignment_rows: dict[str, tuple] = {}
+        self._schedule_rows: dict[str, tuple] = {}
+        self._schedule_page = 0
+        self._replace_rows: dict[str, tuple] = {}
+        self._room_grid_rows: dict[str, tuple] = {}
+        self._teacher_grid_rows: dict[str, tuple] = {}
+        self._matrix_cache: dict[tuple[str, str], dict[int, list[tuple[int, int, str]]]] | None = None
+        self._matrix_cache_version: tuple[int, ...] = ()
+        self._schedule_by_assignment: dict[str, list[ScheduleEntry]] = {}
+        self._schedule_by_assignment_version = -1
+        self._groups_label_cache: dict[tuple[str | None, tuple[str, ...]], str] = {}
+        self._effective_groups_cache: dict[tuple[str | None, tuple[str, ...]], tuple[str, ...]] = {}
+        self._combo_ids: dict[str, str] = {}
+        self._json_dirty = False
+        self._json_flush_id: str | None = None
+        self._json_shown_hash: int | None = None
+        self._json_cache: tuple[tuple[int, ...], str] | None = None
+        self._analysis_cache: tuple[int | None, str] | None = None
+        self._refresh_pending = False
+        self._executor = ThreadPoolExecutor(max_workers=2)
+        self._pending_tasks: list[tuple[Future, Callable[[Future], None]]] = []
+        self._task_poll_id: str | None = None
+        self._task_buttons: list[ctk.CTkButton] = []
+        self.protocol("WM_DELETE_WINDOW", self._on_close)
+
         self.pages: dict[str, ctk.CTkFrame] = {}
+        self._current_page = ""
+        self._built_pages: set[str] = set()
+        self._generation_message = ""
+        self._page_builders = {
+            "data": self._build_data_page,
+            "generation": self._build_generation_page,
+            "rooms": self._build_rooms_page,
+            "teachers": self._build_teachers_page,
+            "replace": self._build_replacements_page,
+            "analysis": self._build_analysis_page,
+        }
+        self._page_refreshers = {
+            "data": (self.populate_json_box, self.refresh_cards, self.refresh_assignment_tree),
+            "generation": (self.refresh_schedule_tree,),
+            "rooms": (self.refresh_room_grid,),
+            "teachers": (self.refresh_teacher_grid,),
+            "replace": (self.refresh_replace_tree,),
+            "analysis": (self.refresh_analysis,),
+        }
         self._build_layout()
-        self._build_data_page()
-        self._build_generation_page()
-        self._build_rooms_page()
-        self._build_teachers_page()
-        self._build_replacements_page()
-        self._build_analysis_page()
         self.show_page("data")
-        self.refresh_ui()
+        self._request_refresh()
 
     def _setup_treeview_style(self) -> None:
         style = ttk.Style(self)
@@ -127,14 +187,34 @@ class SchedulerDesktopApp(ctk.CTk):
             self.pages[key] = page
 
     def show_page(self, key: str) -> None:
-        for page_key, page in self.pages.items():
-            if page_key == key:
-                page.grid()
-            else:
-                page.grid_remove()
+        previous = self._current_page
+        if previous == key:
+            return
+        self._current_page = key
+        if key not in self._built_pages:
+            self._page_builders[key]()
+            self._built_pages.add(key)
+            self._panel_versions.pop("comboboxes", None)
+            self.refresh_comboboxes()
+            for refresh in self._page_refreshers[key]:
+                refresh()
+        if previous:
+            self.pages[previous].grid_remove()
+            self.nav_buttons[previous].configure(fg_color="transparent")
+        self.pages[key].grid()
+        self.nav_buttons[key].configure(fg_color="#2f6d58")
+
+        if key == "data" and self._json_dirty:
+            self.populate_json_box()
 
-        for btn_key, btn in self.nav_buttons.items():
-            btn.configure(fg_color="#2f6d58" if btn_key == key else "transparent")
+    @staticmethod
+    def _card_frame(parent: Any, **overrides: Any) -> ctk.CTkFrame:
+        return ctk.CTkFrame(parent, **{**CARD_STYLE, **overrides})
+
+    @staticmethod
+    def _header_label(parent: Any, text: str, **kwargs: Any) -> ctk.CTkLabel:
+        kwargs.setdefault("font", HEADER_FONT)
+        return ctk.CTkLabel(parent, text=text, **kwargs)
 
     def _build_data_page(self) -> None:
         page = self.pages["data"]
@@ -145,20 +225,17 @@ class SchedulerDesktopApp(ctk.CTk):
         header.grid(row=0, column=0, sticky="ew", padx=22, pady=(18, 10))
         header.grid_columnconfigure(6, weight=1)
 
-        ctk.CTkLabel(
-            header,
-            text="Данные и ограничения",
-            font=("Segoe UI Semibold", 24),
-            text_color="#163b30",
-        ).grid(row=0, column=0, padx=20, pady=14, sticky="w")
-
-        ctk.CTkButton(header, text="Демо-набор", command=self.load_sample).grid(row=0, column=1, padx=6, pady=14)
-        ctk.CTkButton(header, text="Импорт Excel", command=self.import_excel).grid(row=0, column=2, padx=6, pady=14)
-        ctk.CTkButton(header, text="Экспорт Excel", command=self.export_excel).grid(row=0, column=3, padx=6, pady=14)
-        ctk.CTkButton(header, text="Кредиты -> пары", command=self.recompute_sessions_from_credits).grid(
+        self._header_label(header, "Данные и ограничения", font=TITLE_FONT, text_color="#163b30").grid(
+            row=0, column=0, padx=20, pady=14, sticky="w"
+        )
+
+        self._task_button(header, "Демо-набор", self.load_sample).grid(row=0, column=1, padx=6, pady=14)
+        self._task_button(header, "Импорт Excel", self.import_excel).grid(row=0, column=2, padx=6, pady=14)
+        self._task_button(header, "Экспорт Excel", self.export_excel).grid(row=0, column=3, padx=6, pady=14)
+        self._task_button(header, "Кредиты -> пары", self.recompute_sessions_from_credits).grid(
             row=0, column=4, padx=6, pady=14
         )
-        ctk.CTkButton(header, text="Сохранить", command=self.save_state).grid(row=0, column=5, padx=(6, 20), pady=14)
+        self._task_button(header, "Сохранить", self.save_state).grid(row=0, column=5, padx=(6, 20), pady=14)
 
         cards = ctk.CTkFrame(page, fg_color="#f4f7f8")
         cards.grid(row=1, column=0, sticky="ew", padx=22, pady=(0, 10))
@@ -180,7 +257,7 @@ class SchedulerDesktopApp(ctk.CTk):
         body.grid_columnconfigure(1, weight=3)
         body.grid_rowconfigure(0, weight=1)
 
-        left = ctk.CTkFrame(body, fg_color="#ffffff", corner_radius=16, border_width=1, border_color="#d3dfda")
+        left = self._card_frame(body)
         left.grid(row=0, column=0, sticky="nsew", padx=(0, 10))
         left.grid_columnconfigure(0, weight=1)
         left.grid_rowconfigure(1, weight=1)
@@ -191,10 +268,12 @@ class SchedulerDesktopApp(ctk.CTk):
         self.json_box.grid(row=1, column=0, padx=12, pady=(0, 8), sticky="nsew")
         btns = ctk.CTkFrame(left, fg_color="transparent")
         btns.grid(row=2, column=0, padx=12, pady=(0, 12), sticky="ew")
-        ctk.CTkButton(btns, text="Обновить JSON из состояния", command=self.populate_json_box).pack(side="left", padx=(0, 8))
-        ctk.CTkButton(btns, text="Применить JSON в приложение", command=self.apply_json_box).pack(side="left")
+        ctk.CTkButton(
+            btns, text="Обновить JSON из состояния", command=lambda: self.populate_json_box(force=True)
+        ).pack(side="left", padx=(0, 8))
+        self._task_button(btns, "Применить JSON в приложение", self.apply_json_box).pack(side="left")
 
-        right = ctk.CTkFrame(body, fg_color="#ffffff", corner_radius=16, border_width=1, border_color="#d3dfda")
+        right = self._card_frame(body)
         right.grid(row=0, column=1, sticky="nsew")
         right.grid_columnconfigure(0, weight=1)
         right.grid_rowconfigure(4, weight=1)
@@ -204,7 +283,7 @@ class SchedulerDesktopApp(ctk.CTk):
         )
         self.teacher_pick_avail = ctk.CTkComboBox(right, values=[""], width=230)
         self.teacher_pick_avail.grid(row=1, column=0, padx=12, pady=4, sticky="w")
-        ctk.CTkButton(right, text="Редактировать занятость", command=self.edit_teacher_availability).grid(
+        self._task_button(right, "Редактировать занятость", self.edit_teacher_availability).grid(
             row=2, column=0, padx=12, pady=8, sticky="w"
         )
 
@@ -230,18 +309,18 @@ class SchedulerDesktopApp(ctk.CTk):
         page.grid_columnconfigure(0, weight=1)
         page.grid_rowconfigure(2, weight=1)
 
-        top = ctk.CTkFrame(page, fg_color="#ffffff", corner_radius=16, border_width=1, border_color="#d3dfda")
+        top = self._card_frame(page)
         top.grid(row=0, column=0, sticky="ew", padx=22, pady=(18, 10))
         top.grid_columnconfigure(4, weight=1)
-        ctk.CTkLabel(top, text="Генерация расписания", font=("Segoe UI Semibold", 24), text_color="#163b30").grid(
+        self._header_label(top, "Генерация расписания", font=TITLE_FONT, text_color="#163b30").grid(
             row=0, column=0, padx=16, pady=14, sticky="w"
         )
-        ctk.CTkButton(top, text="Сгенерировать", command=self.generate_schedule).grid(row=0, column=1, padx=8, pady=14)
-        ctk.CTkButton(top, text="Очистить расписание", command=self.clear_schedule).grid(row=0, column=2, padx=8, pady=14)
-        ctk.CTkButton(top, text="Экспорт расписания Excel", command=self.export_schedule_excel).grid(
+        self._task_button(top, "Сгенерировать", self.generate_schedule).grid(row=0, column=1, padx=8, pady=14)
+        self._task_button(top, "Очистить расписание", self.clear_schedule).grid(row=0, column=2, padx=8, pady=14)
+        self._task_button(top, "Экспорт расписания Excel", self.export_schedule_excel).grid(
             row=0, column=3, padx=8, pady=14
         )
-        self.generation_result = ctk.CTkLabel(top, text="", font=("Segoe UI", 13), text_color="#3f6257")
+        self.generation_result = ctk.CTkLabel(top, text=self._generation_message, font=("Segoe UI", 13), text_color="#3f6257")
         self.generation_result.grid(row=0, column=4, padx=16, sticky="w")
 
         legend = ctk.CTkLabel(
@@ -252,7 +331,7 @@ class SchedulerDesktopApp(ctk.CTk):
         )
         legend.grid(row=1, column=0, padx=26, pady=(0, 8), sticky="w")
 
-        schedule_frame = ctk.CTkFrame(page, fg_color="#ffffff", corner_radius=16, border_width=1, border_color="#d3dfda")
+        schedule_frame = self._card_frame(page)
         schedule_frame.grid(row=2, column=0, sticky="nsew", padx=22, pady=(0, 20))
         schedule_frame.grid_columnconfigure(0, weight=1)
         schedule_frame.grid_rowconfigure(0, weight=1)
@@ -273,14 +352,26 @@ class SchedulerDesktopApp(ctk.CTk):
             self.schedule_tree.column(col, width=width, stretch=(col in {"discipline", "teacher", "groups"}))
         self.schedule_tree.grid(row=0, column=0, padx=12, pady=12, sticky="nsew")
 
+        self.schedule_pager = ctk.CTkFrame(schedule_frame, fg_color="transparent")
+        self.schedule_pager.grid(row=1, column=0, padx=12, pady=(0, 12), sticky="w")
+        ctk.CTkButton(self.schedule_pager, text="<", width=40, command=lambda: self._turn_schedule_page(-1)).pack(
+            side="left", padx=(0, 6)
+        )
+        self.schedule_page_label = ctk.CTkLabel(self.schedule_pager, text="", font=("Segoe UI", 12))
+        self.schedule_page_label.pack(side="left", padx=6)
+        ctk.CTkButton(self.schedule_pager, text=">", width=40, command=lambda: self._turn_schedule_page(1)).pack(
+            side="left", padx=(6, 0)
+        )
+        self.schedule_pager.grid_remove()
+
     def _build_rooms_page(self) -> None:
         page = self.pages["rooms"]
         page.grid_columnconfigure(0, weight=1)
         page.grid_rowconfigure(1, weight=1)
 
-        top = ctk.CTkFrame(page, fg_color="#ffffff", corner_radius=16, border_width=1, border_color="#d3dfda")
+        top = self._card_frame(page)
         top.grid(row=0, column=0, sticky="ew", padx=22, pady=(18, 10))
-        ctk.CTkLabel(top, text="Просмотр занятости аудитории", font=("Segoe UI Semibold", 22)).grid(
+        self._header_label(top, "Просмотр занятости аудитории").grid(
             row=0, column=0, padx=16, pady=14, sticky="w"
         )
         self.room_pick = ctk.CTkComboBox(top, values=[""], width=200)
@@ -289,7 +380,7 @@ class SchedulerDesktopApp(ctk.CTk):
         self.room_week_entry.grid(row=0, column=2, padx=8, pady=14)
         ctk.CTkButton(top, text="Показать", command=self.refresh_room_grid).grid(row=0, column=3, padx=8, pady=14)
 
-        grid = ctk.CTkFrame(page, fg_color="#ffffff", corner_radius=16, border_width=1, border_color="#d3dfda")
+        grid = self._card_frame(page)
         grid.grid(row=1, column=0, sticky="nsew", padx=22, pady=(0, 20))
         grid.grid_columnconfigure(0, weight=1)
         grid.grid_rowconfigure(0, weight=1)
@@ -308,9 +399,9 @@ class SchedulerDesktopApp(ctk.CTk):
         page.grid_columnconfigure(0, weight=1)
         page.grid_rowconfigure(1, weight=1)
 
-        top = ctk.CTkFrame(page, fg_color="#ffffff", corner_radius=16, border_width=1, border_color="#d3dfda")
+        top = self._card_frame(page)
         top.grid(row=0, column=0, sticky="ew", padx=22, pady=(18, 10))
-        ctk.CTkLabel(top, text="Расписание преподавателя", font=("Segoe UI Semibold", 22)).grid(
+        self._header_label(top, "Расписание преподавателя").grid(
             row=0, column=0, padx=16, pady=14, sticky="w"
         )
         self.teacher_pick = ctk.CTkComboBox(top, values=[""], width=230)
@@ -319,7 +410,7 @@ class SchedulerDesktopApp(ctk.CTk):
         self.teacher_week_entry.grid(row=0, column=2, padx=8, pady=14)
         ctk.CTkButton(top, text="Показать", command=self.refresh_teacher_grid).grid(row=0, column=3, padx=8, pady=14)
 
-        grid = ctk.CTkFrame(page, fg_color="#ffffff", corner_radius=16, border_width=1, border_color="#d3dfda")
+        grid = self._card_frame(page)
         grid.grid(row=1, column=0, sticky="nsew", padx=22, pady=(0, 20))
         grid.grid_columnconfigure(0, weight=1)
         grid.grid_rowconfigure(0, weight=1)
@@ -338,9 +429,9 @@ class SchedulerDesktopApp(ctk.CTk):
         page.grid_columnconfigure(0, weight=1)
         page.grid_rowconfigure(1, weight=1)
 
-        panel = ctk.CTkFrame(page, fg_color="#ffffff", corner_radius=16, border_width=1, border_color="#d3dfda")
+        panel = self._card_frame(page)
         panel.grid(row=0, column=0, sticky="ew", padx=22, pady=(18, 10))
-        ctk.CTkLabel(panel, text="Замена аудитории или ППС", font=("Segoe UI Semibold", 22)).grid(
+        self._header_label(panel, "Замена аудитории или ППС").grid(
             row=0, column=0, padx=16, pady=(12, 10), sticky="w"
         )
 
@@ -356,17 +447,17 @@ class SchedulerDesktopApp(ctk.CTk):
 
         self.lock_slot_switch = ctk.CTkSwitch(panel, text="Зафиксировать текущий слот")
         self.lock_slot_switch.grid(row=1, column=6, padx=(10, 16), pady=6)
-        ctk.CTkButton(panel, text="Применить замену", command=self.apply_replacement).grid(
+        self._task_button(panel, "Применить замену", self.apply_replacement).grid(
             row=2, column=0, padx=16, pady=(8, 14), sticky="w"
         )
-        ctk.CTkButton(panel, text="Снять фиксацию слота", command=self.clear_slot_lock).grid(
+        self._task_button(panel, "Снять фиксацию слота", self.clear_slot_lock).grid(
             row=2, column=1, padx=6, pady=(8, 14), sticky="w"
         )
-        ctk.CTkButton(panel, text="Перегенерировать", command=self.generate_schedule).grid(
+        self._task_button(panel, "Перегенерировать", self.generate_schedule).grid(
             row=2, column=2, padx=6, pady=(8, 14), sticky="w"
         )
 
-        grid = ctk.CTkFrame(page, fg_color="#ffffff", corner_radius=16, border_width=1, border_color="#d3dfda")
+        grid = self._card_frame(page)
         grid.grid(row=1, column=0, sticky="nsew", padx=22, pady=(0, 20))
         grid.grid_columnconfigure(0, weight=1)
         grid.grid_rowconfigure(0, weight=1)
@@ -391,13 +482,13 @@ class SchedulerDesktopApp(ctk.CTk):
         page.grid_columnconfigure(0, weight=1)
         page.grid_rowconfigure(1, weight=1)
 
-        header = ctk.CTkFrame(page, fg_color="#ffffff", corner_radius=16, border_width=1, border_color="#d3dfda")
+        header = self._card_frame(page)
         header.grid(row=0, column=0, sticky="ew", padx=22, pady=(18, 10))
-        ctk.CTkLabel(header, text="Анализ систем расписаний (Sprut и др.)", font=("Segoe UI Semibold", 22)).grid(
+        self._header_label(header, "Анализ систем расписаний (Sprut и др.)").grid(
             row=0, column=0, padx=16, pady=14, sticky="w"
         )
 
-        box_frame = ctk.CTkFrame(page, fg_color="#ffffff", corner_radius=16, border_width=1, border_color="#d3dfda")
+        box_frame = self._card_frame(page)
         box_frame.grid(row=1, column=0, sticky="nsew", padx=22, pady=(0, 20))
         box_frame.grid_columnconfigure(0, weight=1)
         box_frame.grid_rowconfigure(0, weight=1)
@@ -413,40 +504,143 @@ class SchedulerDesktopApp(ctk.CTk):
         self.refresh_comboboxes()
         self.refresh_analysis()
 
+    def _request_refresh(self) -> None:
+        if self._refresh_pending:
+            return
+        self._refresh_pending = True
+        self.after_idle(self._do_refresh)
+
+    def _do_refresh(self) -> None:
+        self._refresh_pending = False
+        self.refresh_ui()
+
+    def _mark_data_changed(self) -> None:
+        self._data_version += 1
+        self.app_state.mark_changed()
+
+    def _mark_schedule_changed(self) -> None:
+        self._schedule_version += 1
+
+    def _is_panel_current(self, panel: str, version: tuple[int, ...]) -> bool:
+        return self._panel_versions.get(panel) == version
+
+    @staticmethod
+    def _sync_tree(tree: ttk.Treeview, cache: dict[str, tuple], rows: list[tuple[str, tuple]]) -> None:
+        new_rows: dict[str, tuple] = {}
+        for key, values in rows:
+            iid = key
+            duplicate = 1
+            while iid in new_rows:
+                duplicate += 1
+                iid = f"{key}#{duplicate}"
+            new_rows[iid] = values
+
+        stale = [iid for iid in cache if iid not in new_rows]
+        if stale:
+            tree.delete(*stale)
+        call = tree.tk.call
+        path = str(tree)
+        append_only = not cache or len(stale) == len(cache)
+        for index, (iid, values) in enumerate(new_rows.items()):
+            old = cache.get(iid)
+            if old is None:
+                call(path, "insert", "", "end" if append_only else index, "-id", iid, "-values", values)
+            elif old != values:
+                call(path, "item", iid, "-values", values)
+
+        order = list(new_rows)
+        current = list(tree.get_children())
+        if current != order:
+            for index, iid in enumerate(order):
+                if current[index] != iid:
+                    tree.move(iid, "", index)
+                    current.remove(iid)
+                    current.insert(index, iid)
+        cache.clear()
+        cache.update(new_rows)
+
     def refresh_cards(self) -> None:
+        if "data" not in self._built_pages:
+            return
+        version = (self._data_version,)
+        if self._is_panel_current("cards", version):
+            return
         self.card_labels["teachers"].configure(text=str(len(self.app_state.teachers)))
         self.card_labels["rooms"].configure(text=str(len(self.app_state.rooms)))
         self.card_labels["groups"].configure(text=str(len(self.app_state.groups)))
         self.card_labels["disciplines"].configure(text=str(len(self.app_state.disciplines)))
         self.card_labels["assignments"].configure(text=str(len(self.app_state.assignments)))
+        self._panel_versions["cards"] = version
 
-    def populate_json_box(self) -> None:
-        payload = json.dumps(self.app_state.to_dict(), ensure_ascii=False, indent=2)
-        self.json_box.delete("1.0", "end")
-        self.json_box.insert("1.0", payload)
+    def populate_json_box(self, force: bool = False) -> None:
+        if force:
+            self._flush_json_box(force=True)
+            return
+        version = (self._data_version, self._schedule_version)
+        if self._is_panel_current("json", version):
+            return
+        self._json_dirty = True
+        if self._current_page != "data":
+            return
+        if self._json_flush_id is not None:
+            self.after_cancel(self._json_flush_id)
+        self._json_flush_id = self.after(JSON_FLUSH_MS, self._flush_json_box)
+
+    def _flush_json_box(self, force: bool = False) -> None:
+        if self._json_flush_id is not None:
+            self.after_cancel(self._json_flush_id)
+            self._json_flush_id = None
+        version = (self._data_version, self._schedule_version)
+        if self._json_cache is not None and self._json_cache[0] == version:
+            payload = self._json_cache[1]
+        else:
+            if orjson is not None:
+                payload = orjson.dumps(
+                    self.app_state.to_dict(), option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS
+                ).decode()
+            else:
+                payload = json.dumps(self.app_state.to_dict(), ensure_ascii=False, indent=2)
+            self._json_cache = (version, payload)
+        payload_hash = hash(payload)
+        if force or payload_hash != self._json_shown_hash:
+            self.json_box.delete("1.0", "end")
+            self.json_box.insert("1.0", payload)
+            self._json_shown_hash = payload_hash
+        self._json_dirty = False
+        self._panel_versions["json"] = version
 
     def apply_json_box(self) -> None:
         try:
             data = json.loads(self.json_box.get("1.0", "end"))
-            self.app_state = AppState.from_dict(data)
-            self.refresh_ui()
+            self._set_app_state(AppState.from_dict(data))
             self._set_status("JSON применен")
         except Exception as exc:
             messagebox.showerror("Ошибка JSON", str(exc))
 
+    def _set_app_state(self, state: AppState) -> None:
+        state.schedule.sort(key=schedule_sort_key)
+        self.app_state = state
+        self._groups_label_cache.clear()
+        self._effective_groups_cache.clear()
+        self._mark_data_changed()
+        self._mark_schedule_changed()
+        self._request_refresh()
+
     def load_sample(self) -> None:
-        self.app_state = sample_state()
-        self.refresh_ui()
+        self._set_app_state(sample_state())
         self._set_status("Загружен демонстрационный набор")
 
     def import_excel(self) -> None:
         path = filedialog.askopenfilename(filetypes=[("Excel files", "*.xlsx")])
         if not path:
             return
+        self._set_status(f"Импорт: {Path(path).name}...")
+        self._run_task(import_state_from_excel, lambda future: self._on_import_done(future, Path(path)), Path(path))
+
+    def _on_import_done(self, future: Future, path: Path) -> None:
         try:
-            self.app_state = import_state_from_excel(Path(path))
-            self.refresh_ui()
-            self._set_status(f"Импортировано: {Path(path).name}")
+            self._set_app_state(future.result())
+            self._set_status(f"Импортировано: {path.name}")
         except Exception as exc:
             messagebox.showerror("Импорт", str(exc))
 
@@ -454,188 +648,278 @@ class SchedulerDesktopApp(ctk.CTk):
         path = filedialog.asksaveasfilename(defaultextension=".xlsx", filetypes=[("Excel files", "*.xlsx")])
         if not path:
             return
+        self._set_status(f"Экспорт: {Path(path).name}...")
+        self._run_task(
+            export_state_to_excel, lambda future: self._on_export_done(future, Path(path)), Path(path), self.app_state
+        )
+
+    def _on_export_done(self, future: Future, path: Path) -> None:
         try:
-            export_state_to_excel(Path(path), self.app_state)
-            self._set_status(f"Экспортировано: {Path(path).name}")
+            future.result()
+            self._set_status(f"Экспортировано: {path.name}")
         except Exception as exc:
             messagebox.showerror("Экспорт", str(exc))
 
     def save_state(self) -> None:
+        self._run_task(self.repo.save, self._on_save_done, self.app_state)
+
+    def _on_save_done(self, future: Future) -> None:
         try:
-            self.repo.save(self.app_state)
+            future.result()
             self._set_status(f"Сохранено в {self.repo.path.name}")
         except Exception as exc:
             messagebox.showerror("Сохранение", str(exc))
 
     def recompute_sessions_from_credits(self) -> None:
-        disc_map = {d.id: d for d in self.app_state.disciplines}
-        changed = 0
-        for assignment in self.app_state.assignments:
-            discipline = disc_map.get(assignment.discipline_id)
-            if not discipline:
-                continue
-            weeks = max(1, assignment.end_week - assignment.start_week + 1)
-            contact_hours = discipline.credits * 15
-            sessions = max(1, round(contact_hours / (weeks * 1.5)))
-            assignment.sessions_per_week = sessions
-            changed += 1
+        disc_map = self.app_state.disciplines_by_id
+        assignments = [a for a in self.app_state.assignments if a.discipline_id in disc_map]
+        count = len(assignments)
+        credits = np.fromiter((disc_map[a.discipline_id].credits for a in assignments), dtype=np.float64, count=count)
+        start_weeks = np.fromiter((a.start_week for a in assignments), dtype=np.int64, count=count)
+        end_weeks = np.fromiter((a.end_week for a in assignments), dtype=np.int64, count=count)
+        weeks = np.maximum(1, end_weeks - start_weeks + 1)
+        sessions = np.maximum(1, np.round(credits * 15 / (weeks * 1.5))).astype(np.int64)
+        for assignment, value in zip(assignments, sessions.tolist()):
+            assignment.sessions_per_week = value
+        changed = count
+        self._mark_data_changed()
         self.refresh_assignment_tree()
         self.populate_json_box()
         self._set_status(f"Обновлено пар/нед по кредитам: {changed}")
 
     def refresh_assignment_tree(self) -> None:
-        for item in self.assignment_tree.get_children():
-            self.assignment_tree.delete(item)
-        disc_map = {d.id: d.name for d in self.app_state.disciplines}
-        teacher_map = {t.id: t.name for t in self.app_state.teachers}
-        stream_map = {s.id: s for s in self.app_state.streams}
+        if "data" not in self._built_pages:
+            return
+        version = (self._data_version,)
+        if self._is_panel_current("assignments", version):
+            return
+        disc_map = self.app_state.discipline_names
+        teacher_map = self.app_state.teacher_names
+        rows = []
         for assignment in self.app_state.assignments:
-            groups_label = ", ".join(self._assignment_effective_group_ids(assignment))
-            if assignment.stream_id and assignment.stream_id in stream_map:
-                stream = stream_map[assignment.stream_id]
-                groups_label = f"{stream.name}: {groups_label}"
-            self.assignment_tree.insert(
-                "",
-                "end",
-                values=(
+            groups_label = self._groups_label(assignment)
+            rows.append(
+                (
                     assignment.id,
-                    disc_map.get(assignment.discipline_id, assignment.discipline_id),
-                    teacher_map.get(assignment.teacher_id, assignment.teacher_id),
-                    groups_label,
-                    f"{assignment.start_week}-{assignment.end_week}",
-                    assignment.sessions_per_week,
-                ),
+                    (
+                        assignment.id,
+                        disc_map[assignment.discipline_id],
+                        teacher_map[assignment.teacher_id],
+                        groups_label,
+                        f"{assignment.start_week}-{assignment.end_week}",
+                        assignment.sessions_per_week,
+                    ),
+                )
             )
+        self._sync_tree(self.assignment_tree, self._assignment_rows, rows)
+        self._panel_versions["assignments"] = version
 
     def generate_schedule(self) -> None:
+        self._set_status("Генерация расписания...")
+        self._run_task(self._solve_schedule, self._on_schedule_ready, self.app_state)
+
+    @staticmethod
+    def _solve_schedule(state: AppState) -> list[ScheduleEntry]:
+        return ScheduleGenerator(state).generate()
+
+    def _on_schedule_ready(self, future: Future) -> None:
         try:
-            schedule = ScheduleGenerator(self.app_state).generate()
+            schedule = future.result()
             self.app_state.schedule = schedule
+            self._mark_schedule_changed()
             self.refresh_schedule_tree()
             self.refresh_replace_tree()
             self.refresh_room_grid()
             self.refresh_teacher_grid()
             self.populate_json_box()
-            self.generation_result.configure(text=f"Сгенерировано: {len(schedule)} строк")
+            self._set_generation_result(f"Сгенерировано: {len(schedule)} строк")
             self._set_status(f"Расписание построено: {len(schedule)} строк")
-        except PlanningError as exc:
+        except Exception as exc:
             messagebox.showerror("Генерация", str(exc))
             self._set_status("Генерация не удалась")
 
     def clear_schedule(self) -> None:
         self.app_state.schedule = []
+        self._mark_schedule_changed()
         self.refresh_schedule_tree()
         self.refresh_replace_tree()
         self.refresh_room_grid()
         self.refresh_teacher_grid()
         self.populate_json_box()
-        self.generation_result.configure(text="Расписание очищено")
+        self._set_generation_result("Расписание очищено")
         self._set_status("Расписание очищено")
 
     def refresh_schedule_tree(self) -> None:
-        for item in self.schedule_tree.get_children():
-            self.schedule_tree.delete(item)
-
-        disc_map = {d.id: d.name for d in self.app_state.disciplines}
-        teacher_map = {t.id: t.name for t in self.app_state.teachers}
-        room_map = {r.id: r.name for r in self.app_state.rooms}
-        for entry in sorted(self.app_state.schedule, key=lambda x: (x.day, x.slot, x.assignment_id)):
-            self.schedule_tree.insert(
-                "",
-                "end",
-                values=(
+        if "generation" not in self._built_pages:
+            return
+        schedule = self.app_state.schedule
+        page_count = max(1, -(-len(schedule) // SCHEDULE_PAGE_SIZE))
+        self._schedule_page = min(self._schedule_page, page_count - 1)
+        version = (self._data_version, self._schedule_version, self._schedule_page)
+        if self._is_panel_current("schedule", version):
+            return
+        if page_count > 1:
+            start = self._schedule_page * SCHEDULE_PAGE_SIZE
+            schedule = schedule[start : start + SCHEDULE_PAGE_SIZE]
+            self.schedule_page_label.configure(
+                text=f"Стр. {self._schedule_page + 1} из {page_count} ({len(self.app_state.schedule)} строк)"
+            )
+            self.schedule_pager.grid()
+        else:
+            self.schedule_pager.grid_remove()
+
+        disc_map = self.app_state.discipline_names
+        teacher_map = self.app_state.teacher_names
+        room_map = self.app_state.room_names
+        day_labels = DAY_LABELS_RU
+        rows = [
+            (
+                f"{entry.assignment_id}:{entry.day}:{entry.slot}",
+                (
                     entry.assignment_id,
-                    disc_map.get(entry.discipline_id, entry.discipline_id),
-                    teacher_map.get(entry.teacher_id, entry.teacher_id),
+                    disc_map[entry.discipline_id],
+                    teacher_map[entry.teacher_id],
                     ", ".join(entry.group_ids),
-                    DAY_LABELS_RU[entry.day],
+                    day_labels[entry.day],
                     entry.slot,
-                    room_map.get(entry.room_id, entry.room_id),
+                    room_map[entry.room_id],
                     f"{entry.start_week}-{entry.end_week}",
                 ),
             )
+            for entry in schedule
+        ]
+        self._sync_tree(self.schedule_tree, self._schedule_rows, rows)
+        self._panel_versions["schedule"] = version
+
+    def _turn_schedule_page(self, step: int) -> None:
+        self._schedule_page = max(0, self._schedule_page + step)
+        self.refresh_schedule_tree()
 
     def refresh_comboboxes(self) -> None:
-        teacher_values = [f"{t.id} | {t.name}" for t in self.app_state.teachers]
-        room_values = [f"{r.id} | {r.name}" for r in self.app_state.rooms]
+        version = (self._data_version,)
+        if self._is_panel_current("comboboxes", version):
+            return
+        combo_ids = {f"{t.id} | {t.name}": t.id for t in self.app_state.teachers}
+        teacher_values = list(combo_ids)
+        room_ids = {f"{r.id} | {r.name}": r.id for r in self.app_state.rooms}
+        room_values = list(room_ids)
+        combo_ids.update(room_ids)
+        self._combo_ids = combo_ids
         assignment_values = [a.id for a in self.app_state.assignments]
 
-        self.teacher_pick.configure(values=teacher_values or [""])
-        self.teacher_pick_avail.configure(values=teacher_values or [""])
-        self.replace_teacher_pick.configure(values=[""] + teacher_values)
-        self.room_pick.configure(values=room_values or [""])
-        self.replace_room_pick.configure(values=[""] + room_values)
-        self.assignment_pick_replace.configure(values=assignment_values or [""])
-
-        if teacher_values and not self.teacher_pick.get():
-            self.teacher_pick.set(teacher_values[0])
-        if teacher_values and not self.teacher_pick_avail.get():
-            self.teacher_pick_avail.set(teacher_values[0])
-        if room_values and not self.room_pick.get():
-            self.room_pick.set(room_values[0])
-        if assignment_values and not self.assignment_pick_replace.get():
-            self.assignment_pick_replace.set(assignment_values[0])
+        built = self._built_pages
+        if "teachers" in built:
+            self.teacher_pick.configure(values=teacher_values or [""])
+            if teacher_values and not self.teacher_pick.get():
+                self.teacher_pick.set(teacher_values[0])
+        if "data" in built:
+            self.teacher_pick_avail.configure(values=teacher_values or [""])
+            if teacher_values and not self.teacher_pick_avail.get():
+                self.teacher_pick_avail.set(teacher_values[0])
+        if "rooms" in built:
+            self.room_pick.configure(values=room_values or [""])
+            if room_values and not self.room_pick.get():
+                self.room_pick.set(room_values[0])
+        if "replace" in built:
+            self.replace_teacher_pick.configure(values=[""] + teacher_values)
+            self.replace_room_pick.configure(values=[""] + room_values)
+            self.assignment_pick_replace.configure(values=assignment_values or [""])
+            if assignment_values and not self.assignment_pick_replace.get():
+                self.assignment_pick_replace.set(assignment_values[0])
+        self._panel_versions["comboboxes"] = version
 
     def refresh_room_grid(self) -> None:
-        for item in self.room_grid.get_children():
-            self.room_grid.delete(item)
-        selected_room = self._id_from_combo(self.room_pick.get())
-        week = self._read_week(self.room_week_entry.get())
-        if not selected_room:
+        if "rooms" not in self._built_pages:
             return
-
-        matrix = self._build_matrix()
-        for slot in SLOTS:
-            row = [matrix.get((week, day, slot, "room", selected_room), "") for day in range(len(DAYS))]
-            self.room_grid.insert("", "end", values=(slot, *row))
+        self._refresh_slot_grid(
+            self.room_grid,
+            self._room_grid_rows,
+            "room",
+            self._id_from_combo(self.room_pick.get()),
+            self._read_week(self.room_week_entry.get()),
+        )
 
     def refresh_teacher_grid(self) -> None:
-        for item in self.teacher_grid.get_children():
-            self.teacher_grid.delete(item)
-        teacher_id = self._id_from_combo(self.teacher_pick.get())
-        week = self._read_week(self.teacher_week_entry.get())
-        if not teacher_id:
+        if "teachers" not in self._built_pages:
             return
+        self._refresh_slot_grid(
+            self.teacher_grid,
+            self._teacher_grid_rows,
+            "teacher",
+            self._id_from_combo(self.teacher_pick.get()),
+            self._read_week(self.teacher_week_entry.get()),
+        )
 
-        matrix = self._build_matrix()
-        for slot in SLOTS:
-            row = [matrix.get((week, day, slot, "teacher", teacher_id), "") for day in range(len(DAYS))]
-            self.teacher_grid.insert("", "end", values=(slot, *row))
-
-    def _build_matrix(self) -> dict[tuple[int, int, int, str, str], str]:
-        disc_map = {d.id: d.name for d in self.app_state.disciplines}
-        room_map = {r.id: r.name for r in self.app_state.rooms}
-        matrix: dict[tuple[int, int, int, str, str], str] = {}
-        for entry in self.app_state.schedule:
-            for week in range(entry.start_week, entry.end_week + 1):
-                matrix[(week, entry.day, entry.slot, "room", entry.room_id)] = (
-                    f"{entry.assignment_id} {disc_map.get(entry.discipline_id, '')}"
-                )
-                matrix[(week, entry.day, entry.slot, "teacher", entry.teacher_id)] = (
-                    f"{entry.assignment_id} {disc_map.get(entry.discipline_id, '')} [{room_map.get(entry.room_id, '')}]"
+    def _refresh_slot_grid(
+        self, tree: ttk.Treeview, cache: dict[str, tuple], kind: str, selected_id: str, week: int
+    ) -> None:
+        rows = []
+        if selected_id:
+            cells = self._build_matrix().get((kind, selected_id), {})
+            matrix_cell = self._matrix_cell
+            rows = [
+                (
+                    str(slot),
+                    (slot, *[matrix_cell(cells, week, slot_index(day, slot)) for day in range(len(DAYS))]),
                 )
+                for slot in SLOTS
+            ]
+        self._sync_tree(tree, cache, rows)
+
+    def _build_matrix(self) -> dict[tuple[str, str], dict[int, list[tuple[int, int, str]]]]:
+        version = (self._data_version, self._schedule_version)
+        if self._matrix_cache is not None and self._matrix_cache_version == version:
+            return self._matrix_cache
+
+        disc_map = self.app_state.discipline_names
+        room_map = self.app_state.room_names
+        matrix: dict[tuple[str, str], dict[int, list[tuple[int, int, str]]]] = {}
+        for entry in self.app_state.schedule:
+            room_cells = matrix.setdefault(("room", entry.room_id), {})
+            teacher_cells = matrix.setdefault(("teacher", entry.teacher_id), {})
+            room_text = f"{entry.assignment_id} {disc_map.get(entry.discipline_id, '')}"
+            teacher_text = f"{room_text} [{room_map.get(entry.room_id, '')}]"
+            key = slot_index(entry.day, entry.slot)
+            room_cells.setdefault(key, []).append((entry.start_week, entry.end_week, room_text))
+            teacher_cells.setdefault(key, []).append((entry.start_week, entry.end_week, teacher_text))
+        self._matrix_cache = matrix
+        self._matrix_cache_version = version
         return matrix
 
+    @staticmethod
+    def _matrix_cell(cells: dict[int, list[tuple[int, int, str]]], week: int, index: int) -> str:
+        for start_week, end_week, text in reversed(cells.get(index, ())):
+            if start_week <= week <= end_week:
+                return text
+        return ""
+
     def refresh_replace_tree(self) -> None:
-        for item in self.replace_tree.get_children():
-            self.replace_tree.delete(item)
-        disc_map = {d.id: d.name for d in self.app_state.disciplines}
-        teacher_map = {t.id: t.name for t in self.app_state.teachers}
-        room_map = {r.id: r.name for r in self.app_state.rooms}
-        for entry in self.app_state.schedule:
-            self.replace_tree.insert(
-                "",
-                "end",
-                values=(
+        if "replace" not in self._built_pages:
+            return
+        version = (self._data_version, self._schedule_version)
+        if self._is_panel_current("replace", version):
+            return
+        disc_map = self.app_state.discipline_names
+        teacher_map = self.app_state.teacher_names
+        room_map = self.app_state.room_names
+        day_labels = DAY_LABELS_RU
+        rows = [
+            (
+                f"{entry.assignment_id}:{entry.day}:{entry.slot}",
+                (
                     entry.assignment_id,
-                    disc_map.get(entry.discipline_id, entry.discipline_id),
-                    teacher_map.get(entry.teacher_id, entry.teacher_id),
-                    room_map.get(entry.room_id, entry.room_id),
-                    DAY_LABELS_RU[entry.day],
+                    disc_map[entry.discipline_id],
+                    teacher_map[entry.teacher_id],
+                    room_map[entry.room_id],
+                    day_labels[entry.day],
                     entry.slot,
                     f"{entry.start_week}-{entry.end_week}",
                 ),
             )
+            for entry in self.app_state.schedule
+        ]
+        self._sync_tree(self.replace_tree, self._replace_rows, rows)
+        self._panel_versions["replace"] = version
 
     def apply_replacement(self) -> None:
         assignment_id = self.assignment_pick_replace.get().strip()
@@ -648,17 +932,25 @@ class SchedulerDesktopApp(ctk.CTk):
 
         teacher_id = self._id_from_combo(self.replace_teacher_pick.get())
         room_id = self._id_from_combo(self.replace_room_pick.get())
-        if teacher_id:
+        dirty = False
+        if teacher_id and assignment.teacher_id != teacher_id:
             assignment.teacher_id = teacher_id
-        if room_id:
+            dirty = True
+        if room_id and assignment.room_id != room_id:
             assignment.room_id = room_id
+            dirty = True
 
         if self.lock_slot_switch.get() == 1:
             entry = self._first_schedule_entry(assignment_id)
             if entry:
-                assignment.lock_day = entry.day
-                assignment.lock_slot = entry.slot
-                assignment.lock_room_id = entry.room_id
+                lock = (entry.day, entry.slot, entry.room_id)
+                if (assignment.lock_day, assignment.lock_slot, assignment.lock_room_id) != lock:
+                    assignment.lock_day, assignment.lock_slot, assignment.lock_room_id = lock
+                    dirty = True
+        if not dirty:
+            self._set_status(f"Замена для {assignment_id} не изменила данные")
+            return
+        self._mark_data_changed()
         self.populate_json_box()
         self.refresh_assignment_tree()
         self._set_status(f"Замена применена для {assignment_id}")
@@ -668,35 +960,59 @@ class SchedulerDesktopApp(ctk.CTk):
         assignment = self._find_assignment(assignment_id)
         if not assignment:
             return
+        if assignment.lock_day is None and assignment.lock_slot is None and assignment.lock_room_id is None:
+            self._set_status(f"Фиксация для {assignment_id} не задана")
+            return
         assignment.lock_day = None
         assignment.lock_slot = None
         assignment.lock_room_id = None
+        self._mark_data_changed()
         self.populate_json_box()
         self._set_status(f"Фиксация снята для {assignment_id}")
 
     def _first_schedule_entry(self, assignment_id: str) -> ScheduleEntry | None:
-        for entry in self.app_state.schedule:
-            if entry.assignment_id == assignment_id:
-                return entry
-        return None
+        if self._schedule_by_assignment_version != self._schedule_version:
+            index: dict[str, list[ScheduleEntry]] = {}
+            for entry in self.app_state.schedule:
+                index.setdefault(entry.assignment_id, []).append(entry)
+            for entries in index.values():
+                entries.sort(key=ENTRY_TIME_KEY)
+            self._schedule_by_assignment = index
+            self._schedule_by_assignment_version = self._schedule_version
+        return self._schedule_by_assignment.get(assignment_id, (None,))[0]
 
     def _find_assignment(self, assignment_id: str) -> Assignment | None:
-        for assignment in self.app_state.assignments:
-            if assignment.id == assignment_id:
-                return assignment
-        return None
+        return self.app_state.assignments_by_id.get(assignment_id)
 
-    def _assignment_effective_group_ids(self, assignment: Assignment) -> list[str]:
-        group_ids = set(assignment.group_ids)
-        if assignment.stream_id:
-            stream = next((s for s in self.app_state.streams if s.id == assignment.stream_id), None)
-            if stream:
-                group_ids.update(stream.group_ids)
-        return sorted(group_ids)
+    def _groups_label(self, assignment: Assignment) -> str:
+        key = (assignment.stream_id, tuple(assignment.group_ids))
+        label = self._groups_label_cache.get(key)
+        if label is None:
+            label = ", ".join(self._assignment_effective_group_ids(assignment))
+            stream_map = self.app_state.stream_names
+            if assignment.stream_id and assignment.stream_id in stream_map:
+                label = f"{stream_map[assignment.stream_id]}: {label}"
+            self._groups_label_cache[key] = label
+        return label
+
+    def _assignment_effective_group_ids(self, assignment: Assignment) -> tuple[str, ...]:
+        group_ids = tuple(assignment.group_ids)
+        key = (assignment.stream_id, group_ids)
+        effective = self._effective_groups_cache.get(key)
+        if effective is None:
+            stream = self.app_state.streams_by_id.get(assignment.stream_id) if assignment.stream_id else None
+            if stream:
+                effective = tuple(sorted({*group_ids, *stream.group_ids}))
+            elif all(left < right for left, right in zip(group_ids, group_ids[1:])):
+                effective = group_ids
+            else:
+                effective = tuple(sorted(set(group_ids)))
+            self._effective_groups_cache[key] = effective
+        return effective
 
     def edit_teacher_availability(self) -> None:
         teacher_id = self._id_from_combo(self.teacher_pick_avail.get())
-        teacher = next((t for t in self.app_state.teachers if t.id == teacher_id), None)
+        teacher = self.app_state.teachers_by_id.get(teacher_id)
         if not teacher:
             return
 
@@ -712,11 +1028,19 @@ class SchedulerDesktopApp(ctk.CTk):
         )
         day_frame = ctk.CTkFrame(window, fg_color="transparent")
         day_frame.grid(row=0, column=1, padx=14, pady=(10, 8), sticky="w")
-        day_vars: dict[int, ctk.IntVar] = {}
-        for day in range(len(DAYS)):
-            var = ctk.IntVar(value=1 if day in teacher.work_days else 0)
-            day_vars[day] = var
-            ctk.CTkCheckBox(day_frame, text=DAY_LABELS_RU[day], variable=var).pack(side="left", padx=6)
+        day_count = len(DAYS)
+        work_days = set(teacher.work_days)
+        work_mask = sum(1 << day for day in range(day_count) if day in work_days)
+
+        def toggle_day(day: int) -> None:
+            nonlocal work_mask
+            work_mask ^= 1 << day
+
+        for day in range(day_count):
+            box = ctk.CTkCheckBox(day_frame, text=DAY_LABELS_RU[day], command=lambda d=day: toggle_day(d))
+            if work_mask >> day & 1:
+                box.select()
+            box.pack(side="left", padx=6)
 
         ctk.CTkLabel(window, text="Недоступные слоты (галочка = нельзя занимать)", font=("Segoe UI Semibold", 14)).grid(
             row=1, column=0, columnspan=2, padx=14, pady=(8, 4), sticky="w"
@@ -724,24 +1048,41 @@ class SchedulerDesktopApp(ctk.CTk):
         matrix = ctk.CTkScrollableFrame(window, fg_color="#ffffff", width=820, height=350)
         matrix.grid(row=2, column=0, columnspan=2, padx=14, pady=(0, 10), sticky="nsew")
 
-        slot_vars: dict[str, ctk.IntVar] = {}
-        for day in range(len(DAYS)):
+        blocked_keys = set(teacher.blocked_slots)
+        blocked_mask = 0
+        for slot_idx, slot in enumerate(SLOTS):
+            for day in range(day_count):
+                if slot_key(day, slot) in blocked_keys:
+                    blocked_mask |= 1 << (slot_idx * day_count + day)
+
+        def toggle_slot(bit: int) -> None:
+            nonlocal blocked_mask
+            blocked_mask ^= 1 << bit
+
+        for day in range(day_count):
             ctk.CTkLabel(matrix, text=DAY_LABELS_RU[day], font=("Segoe UI Semibold", 13)).grid(
                 row=0, column=day + 1, padx=6, pady=6
             )
-        for row_idx, slot in enumerate(SLOTS, start=1):
-            ctk.CTkLabel(matrix, text=f"{slot} пара").grid(row=row_idx, column=0, padx=6, pady=4)
-            for day in range(len(DAYS)):
-                key = slot_key(day, slot)
-                var = ctk.IntVar(value=1 if key in teacher.blocked_slots else 0)
-                slot_vars[key] = var
-                ctk.CTkCheckBox(matrix, text="", width=20, variable=var).grid(
-                    row=row_idx, column=day + 1, padx=6, pady=2
-                )
+        for slot_idx, slot in enumerate(SLOTS):
+            ctk.CTkLabel(matrix, text=f"{slot} пара").grid(row=slot_idx + 1, column=0, padx=6, pady=4)
+            for day in range(day_count):
+                bit = slot_idx * day_count + day
+                box = ctk.CTkCheckBox(matrix, text="", width=20, command=lambda b=bit: toggle_slot(b))
+                if blocked_mask >> bit & 1:
+                    box.select()
+                box.grid(row=slot_idx + 1, column=day + 1, padx=6, pady=2)
 
         def commit() -> None:
-            teacher.work_days = [day for day, var in day_vars.items() if var.get() == 1]
-            teacher.blocked_slots = [key for key, var in slot_vars.items() if var.get() == 1]
+            teacher.work_days = [day for day in range(day_count) if work_mask >> day & 1]
+            blocked_slots = []
+            mask = blocked_mask
+            while mask:
+                bit = (mask & -mask).bit_length() - 1
+                slot_idx, day = divmod(bit, day_count)
+                blocked_slots.append(slot_key(day, SLOTS[slot_idx]))
+                mask &= mask - 1
+            teacher.blocked_slots = blocked_slots
+            self._mark_data_changed()
             self.populate_json_box()
             self._set_status(f"График ППС обновлен: {teacher.id}")
             window.destroy()
@@ -757,40 +1098,151 @@ class SchedulerDesktopApp(ctk.CTk):
         path = filedialog.asksaveasfilename(defaultextension=".xlsx", filetypes=[("Excel files", "*.xlsx")])
         if not path:
             return
-        disc_map = {d.id: d.name for d in self.app_state.disciplines}
-        teacher_map = {t.id: t.name for t in self.app_state.teachers}
-        room_map = {r.id: r.name for r in self.app_state.rooms}
-        wb = Workbook()
-        ws = wb.active
-        ws.title = "schedule"
-        ws.append(["assignment_id", "discipline", "teacher", "groups", "day", "slot", "room", "weeks"])
-        for entry in self.app_state.schedule:
-            ws.append(
-                [
-                    entry.assignment_id,
-                    disc_map.get(entry.discipline_id, entry.discipline_id),
-                    teacher_map.get(entry.teacher_id, entry.teacher_id),
-                    ",".join(entry.group_ids),
-                    DAY_LABELS_RU[entry.day],
-                    entry.slot,
-                    room_map.get(entry.room_id, entry.room_id),
-                    f"{entry.start_week}-{entry.end_week}",
-                ]
+        schedule = self.app_state.schedule
+        segmented = len(schedule) > EXPORT_SEGMENT_THRESHOLD and messagebox.askyesno(
+            "Экспорт",
+            f"В расписании {len(schedule)} строк. Разбить экспорт на файлы по {EXPORT_SEGMENT_SIZE} строк?",
+        )
+        base = Path(path)
+        if segmented:
+            starts = range(0, len(schedule), EXPORT_SEGMENT_SIZE)
+            parts = [
+                (base.with_name(f"{base.stem}_part{seg:03d}{base.suffix}"), schedule[start : start + EXPORT_SEGMENT_SIZE])
+                for seg, start in enumerate(starts)
+            ]
+        else:
+            parts = [(base, list(schedule))]
+        name_maps = (self.app_state.discipline_names, self.app_state.teacher_names, self.app_state.room_names)
+        self._set_status(f"Экспорт расписания: {base.name}...")
+        self._run_task(self._write_schedule_export, self._on_schedule_export_done, parts, name_maps)
+
+    @classmethod
+    def _write_schedule_export(
+        cls, parts: list[tuple[Path, list[ScheduleEntry]]], name_maps: tuple[NameMap, NameMap, NameMap]
+    ) -> list[Path]:
+        for part, entries in parts:
+            rows = cls._schedule_export_rows(entries, *name_maps)
+            export_table_to_excel(part, "schedule", SCHEDULE_EXPORT_HEADER, rows)
+        return [part for part, _ in parts]
+
+    def _on_schedule_export_done(self, future: Future) -> None:
+        try:
+            paths = future.result()
+        except Exception as exc:
+            messagebox.showerror("Экспорт", str(exc))
+            return
+        if len(paths) == 1:
+            self._set_status(f"Расписание Excel экспортировано: {paths[0].name}")
+        else:
+            self._set_status(f"Расписание Excel экспортировано: {len(paths)} файлов {paths[0].name} … {paths[-1].name}")
+
+    @staticmethod
+    def _schedule_export_rows(
+        entries: list[ScheduleEntry], disc_map: NameMap, teacher_map: NameMap, room_map: NameMap
+    ) -> Iterator[tuple[Any, ...]]:
+        joined_groups: dict[tuple[str, ...], str] = {}
+        week_ranges: dict[tuple[int, int], str] = {}
+        find_groups = joined_groups.get
+        find_weeks = week_ranges.get
+        day_labels = DAY_LABELS_RU
+        for entry in entries:
+            group_key = tuple(entry.group_ids)
+            groups = find_groups(group_key)
+            if groups is None:
+                groups = joined_groups[group_key] = ",".join(group_key)
+            week_key = (entry.start_week, entry.end_week)
+            weeks = find_weeks(week_key)
+            if weeks is None:
+                weeks = week_ranges[week_key] = f"{entry.start_week}-{entry.end_week}"
+            yield (
+                entry.assignment_id,
+                disc_map[entry.discipline_id],
+                teacher_map[entry.teacher_id],
+                groups,
+                day_labels[entry.day],
+                entry.slot,
+                room_map[entry.room_id],
+                weeks,
             )
-        wb.save(Path(path))
-        self._set_status(f"Расписание Excel экспортировано: {Path(path).name}")
 
     def refresh_analysis(self) -> None:
+        if "analysis" not in self._built_pages:
+            return
         path = Path("docs/competitor_analysis.md")
-        content = path.read_text(encoding="utf-8") if path.exists() else "Файл анализа не найден."
-        self.analysis_box.delete("1.0", "end")
-        self.analysis_box.insert("1.0", content)
+        try:
+            mtime: int | None = path.stat().st_mtime_ns
+        except OSError:
+            mtime = None
+        cached = self._analysis_cache
+        if cached is not None and cached[0] == mtime:
+            return
+        content = path.read_text(encoding="utf-8") if mtime is not None else "Файл анализа не найден."
+        self._analysis_cache = (mtime, content)
+        old_lines = cached[1].split("\n") if cached is not None else []
+        new_lines = content.split("\n")
+        if old_lines == new_lines:
+            return
+
+        same = 0
+        for old_line, new_line in zip(old_lines, new_lines):
+            if old_line != new_line:
+                break
+            same += 1
+        if same == 0:
+            self.analysis_box.delete("1.0", "end")
+            self.analysis_box.insert("1.0", content)
+            return
+        self.analysis_box.delete(f"{same}.end", "end")
+        tail = new_lines[same:]
+        if tail:
+            self.analysis_box.insert(f"{same}.end", "\n" + "\n".join(tail))
+
+    def _task_button(self, parent: Any, text: str, command: Callable[[], None]) -> ctk.CTkButton:
+        button = ctk.CTkButton(parent, text=text, command=command)
+        if self._pending_tasks:
+            button.configure(state="disabled")
+        self._task_buttons.append(button)
+        return button
+
+    def _run_task(self, func: Callable[..., Any], on_done: Callable[[Future], None], *args: Any) -> None:
+        self._pending_tasks.append((self._executor.submit(func, *args), on_done))
+        if len(self._pending_tasks) == 1:
+            for button in self._task_buttons:
+                button.configure(state="disabled")
+        if self._task_poll_id is None:
+            self._task_poll_id = self.after(TASK_POLL_MS, self._poll_tasks)
+
+    def _poll_tasks(self) -> None:
+        self._task_poll_id = None
+        finished = []
+        pending = []
+        for task in self._pending_tasks:
+            (finished if task[0].done() else pending).append(task)
+        self._pending_tasks = pending
+        if not self._pending_tasks:
+            for button in self._task_buttons:
+                button.configure(state="normal")
+        for future, on_done in finished:
+            on_done(future)
+        if self._pending_tasks and self._task_poll_id is None:
+            self._task_poll_id = self.after(TASK_POLL_MS, self._poll_tasks)
+
+    def _on_close(self) -> None:
+        self._executor.shutdown(wait=False, cancel_futures=True)
+        self.destroy()
 
     def _set_status(self, text: str) -> None:
         self.status_label.configure(text=text)
 
-    @staticmethod
-    def _id_from_combo(value: str) -> str:
+    def _set_generation_result(self, text: str) -> None:
+        self._generation_message = text
+        if "generation" in self._built_pages:
+            self.generation_result.configure(text=text)
+
+    def _id_from_combo(self, value: str) -> str:
+        combo_id = self._combo_ids.get(value)
+        if combo_id is not None:
+            return combo_id
         if "|" in value:
             return value.split("|", 1)[0].strip()
         return value.strip()